@@ -8,7 +8,7 @@ import LoadingSpinner from './LoadingSpinner';
 import { exportAPI } from '../utils/api';
 
 interface ExportOptions {
-  format: 'json' | 'csv' | 'excel' | 'backup';
+  format: 'json' | 'csv' | 'excel' | 'backup' | 'parquet';
   includeCustomers: boolean;
   includeInvoices: boolean;
   includeSettings: boolean;
@@ -141,13 +141,13 @@ const ExportImportModal: React.FC<ExportImportModalProps> = ({ isOpen, onClose }
     const file = event.target.files?.[0];
     if (file) {
       const validTypes = ['application/json', 'application/zip'];
-      const validExtensions = ['.json', '.zip'];
+      const validExtensions = ['.json', '.zip', '.xlsx'];
       
       const isValidType = validTypes.includes(file.type) || 
                          validExtensions.some(ext => file.name.toLowerCase().endsWith(ext));
       
       if (!isValidType) {
-        setError('Please select a valid JSON or ZIP file.');
+        setError('Please select a valid JSON, ZIP or Excel file.');
         return;
       }
       
@@ -304,6 +304,7 @@ const ExportImportModal: React.FC<ExportImportModalProps> = ({ isOpen, onClose }
                     <option value="excel">Excel Spreadsheet</option>
                     <option value="csv">CSV Files (ZIP)</option>
                     <option value="backup">Complete Backup (ZIP)</option>
+                    <option value="parquet">Parquet Tables (ZIP)</option>
                   </select>
                 </div>
 
@@ -402,7 +403,7 @@ const ExportImportModal: React.FC<ExportImportModalProps> = ({ isOpen, onClose }
                 </label>
                 <input
                   type="file"
-                  accept=".json,.zip"
+                  accept=".json,.zip,.xlsx"
                   onChange={handleFileSelect}
                   className="w-full px-3 py-2 border border-gray-300 dark:border-gray-600 rounded-lg 
                            bg-white dark:bg-gray-700 text-gray-900 dark:text-gray-100
@@ -411,7 +412,7 @@ const ExportImportModal: React.FC<ExportImportModalProps> = ({ isOpen, onClose }
                            hover:file:bg-blue-100"
                 />
                 <p className="text-xs text-gray-500 dark:text-gray-400 mt-1">
-                  Supported formats: JSON, ZIP (backup files)
+                  Supported formats: JSON, ZIP (backup or CSV export), Excel
                 </p>
               </div>
 
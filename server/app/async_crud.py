@@ -0,0 +1,55 @@
+from typing import Optional, Union
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app import models
+
+# Async variants of the CRUD operations used by async endpoints.
+# They accept the session from get_async_db: an AsyncSession, or a regular
+# Session when the async engine is disabled, whose calls then run in the
+# thread pool instead of on the event loop.
+AnySession = Union[AsyncSession, Session]
+
+async def _scalar(db: AnySession, statement):
+    if isinstance(db, AsyncSession):
+        return await db.scalar(statement)
+    return await run_in_threadpool(db.scalar, statement)
+
+async def _commit(db: AnySession, *refresh):
+    if isinstance(db, AsyncSession):
+        await db.commit()
+        for instance in refresh:
+            await db.refresh(instance)
+        return
+
+    def commit():
+        db.commit()
+        for instance in refresh:
+            db.refresh(instance)
+    await run_in_threadpool(commit)
+
+# User CRUD operations
+async def get_user_by_email(db: AnySession, email: str) -> Optional[models.User]:
+    return await _scalar(db, select(models.User).where(models.User.email == email).limit(1))
+
+async def count_users(db: AnySession) -> int:
+    return await _scalar(db, select(func.count(models.User.id)))
+
+async def create_user_with_settings(db: AnySession, email: str, name: str, hashed_password: str) -> models.User:
+    """Create a user together with default company settings"""
+    db_user = models.User(email=email, name=name, hashed_password=hashed_password)
+    db.add(db_user)
+    await _commit(db, db_user)
+
+    db_settings = models.Settings(
+        user_id=db_user.id,
+        company_name="My Company",
+        invoice_prefix="INV-",
+        currency="USD"
+    )
+    db.add(db_settings)
+    await _commit(db, db_user)
+    return db_user
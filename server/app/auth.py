@@ -1,5 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
+import asyncio
+import threading
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
@@ -7,16 +10,28 @@ from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 import os
 
-from app import models, schemas
-from app.database import get_db
+from app import models, schemas, async_crud
+from app.database import get_db, get_async_db
+from app.identity_cache import identity_cache
 
 # Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your_secret_key_here")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# bcrypt cost factor, each extra round doubles the time of a hash or verify
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", 12))
+
+# Threads that hash and verify passwords off the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Hash operations allowed to run or wait at once, further logins get a 503
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", PASSWORD_HASH_WORKERS * 16))
+
 # Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=PASSWORD_HASH_ROUNDS)
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+password_slots = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
 
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
@@ -31,6 +46,26 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+async def run_password_task(func, *args):
+    """Run a bcrypt call in the password executor without blocking the event loop"""
+    if not password_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent login attempts, please retry",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(password_executor, func, *args)
+    finally:
+        password_slots.release()
+
+async def verify_password_async(plain_password, hashed_password):
+    return await run_password_task(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password):
+    return await run_password_task(get_password_hash, password)
+
 def get_user(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
 
@@ -42,6 +77,14 @@ def authenticate_user(db: Session, email: str, password: str):
         return False
     return user
 
+async def authenticate_user_async(db: async_crud.AnySession, email: str, password: str):
+    user = await async_crud.get_user_by_email(db, email)
+    if not user:
+        return False
+    if not await verify_password_async(password, user.hashed_password):
+        return False
+    return user
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -52,12 +95,16 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: async_crud.AnySession = Depends(get_async_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    cached_user = identity_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -66,15 +113,19 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         token_data = schemas.TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    user = get_user(db, email=token_data.email)
+    user = await async_crud.get_user_by_email(db, email=token_data.email)
     if user is None:
         raise credentials_exception
-    return user
+
+    # Cache a detached snapshot so later requests with this token skip the lookup
+    user_snapshot = schemas.User.model_validate(user, from_attributes=True)
+    identity_cache.set(token, user_snapshot, payload.get("exp"))
+    return user_snapshot
 
 # Auth endpoints
 @auth_router.post("/token", response_model=schemas.Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: async_crud.AnySession = Depends(get_async_db)):
+    user = await authenticate_user_async(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -88,8 +139,8 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     return {"access_token": access_token, "token_type": "bearer"}
 
 @auth_router.post("/register", response_model=schemas.User)
-async def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = get_user(db, email=user.email)
+async def register_user(user: schemas.UserCreate, db: async_crud.AnySession = Depends(get_async_db)):
+    db_user = await async_crud.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -97,36 +148,23 @@ async def register_user(user: schemas.UserCreate, db: Session = Depends(get_db))
         )
     
     # Create new user with email as name if no name provided
-    hashed_password = get_password_hash(user.password)
-    db_user = models.User(
+    hashed_password = await get_password_hash_async(user.password)
+    # Create the user and its default settings
+    return await async_crud.create_user_with_settings(
+        db,
         email=user.email,
         name=user.name if user.name else user.email,  # Use email if no name provided
         hashed_password=hashed_password
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    
-    # Create default settings for the user
-    db_settings = models.Settings(
-        user_id=db_user.id,
-        company_name="My Company",
-        invoice_prefix="INV-",
-        currency="USD"
-    )
-    db.add(db_settings)
-    db.commit()
-    
-    return db_user
 
 @auth_router.get("/me", response_model=schemas.User)
-async def read_users_me(current_user: models.User = Depends(get_current_user)):
+async def read_users_me(current_user: schemas.User = Depends(get_current_user)):
     return current_user
 
 @auth_router.get("/check-setup")
-async def check_first_time_setup(db: Session = Depends(get_db)):
+async def check_first_time_setup(db: async_crud.AnySession = Depends(get_async_db)):
     """
     Check if this is a first-time setup (no users in the system)
     """
-    user_count = db.query(models.User).count()
+    user_count = await async_crud.count_users(db)
     return {"isFirstTimeSetup": user_count == 0}
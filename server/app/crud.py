@@ -1,12 +1,18 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, desc, extract
+from sqlalchemy.orm import Session, joinedload, contains_eager, selectinload
+from sqlalchemy import func, desc, extract, select
 import sqlalchemy.orm
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import io
+import json
+import logging
+import os
 from typing import List, Optional
 from app import models, schemas
+from app.database import SessionLocal
 from app.pdf_generator import generate_pdf
 
+logger = logging.getLogger(__name__)
+
 # User CRUD operations
 def get_user(db: Session, user_id: int):
     return db.query(models.User).filter(models.User.id == user_id).first()
@@ -38,12 +44,14 @@ def update_user(db: Session, user_id: int, user: schemas.UserUpdate):
 def get_customer(db: Session, customer_id: int, user_id: int):
     return db.query(models.Customer).filter(
         models.Customer.id == customer_id,
-        models.Customer.user_id == user_id
+        models.Customer.user_id == user_id,
+        models.Customer.deleted_at.is_(None)
     ).first()
 
 def get_customers(db: Session, user_id: int, skip: int = 0, limit: int = 100):
     return db.query(models.Customer).filter(
-        models.Customer.user_id == user_id
+        models.Customer.user_id == user_id,
+        models.Customer.deleted_at.is_(None)
     ).offset(skip).limit(limit).all()
 
 def create_customer(db: Session, customer: schemas.CustomerCreate, user_id: int):
@@ -63,16 +71,24 @@ def update_customer(db: Session, customer_id: int, customer: schemas.CustomerUpd
     return db_customer
 
 def delete_customer(db: Session, customer_id: int):
+    """Soft-delete a customer and its invoices; app.purge removes the rows later"""
     db_customer = db.query(models.Customer).filter(models.Customer.id == customer_id).first()
     if db_customer:
-        db.delete(db_customer)
+        deleted_at = datetime.now(timezone.utc)
+        db.query(models.Invoice).filter(
+            models.Invoice.customer_id == customer_id,
+            models.Invoice.deleted_at.is_(None)
+        ).update({"deleted_at": deleted_at}, synchronize_session=False)
+        db_customer.deleted_at = deleted_at
         db.commit()
+        db.refresh(db_customer)
     return db_customer
 
 def get_customer_stats(db: Session, user_id: int):
     # Total customers
     total_customers = db.query(func.count(models.Customer.id)).filter(
-        models.Customer.user_id == user_id
+        models.Customer.user_id == user_id,
+        models.Customer.deleted_at.is_(None)
     ).scalar()
     
     # New customers this month
@@ -80,13 +96,15 @@ def get_customer_stats(db: Session, user_id: int):
     first_day_of_month = datetime(current_date.year, current_date.month, 1)
     new_customers_this_month = db.query(func.count(models.Customer.id)).filter(
         models.Customer.user_id == user_id,
+        models.Customer.deleted_at.is_(None),
         models.Customer.created_at >= first_day_of_month
     ).scalar()
     
     # Active customers (with at least one invoice)
     active_customers = db.query(func.count(models.Customer.id)).filter(
         models.Customer.user_id == user_id,
-        models.Customer.invoices.any()
+        models.Customer.deleted_at.is_(None),
+        models.Customer.invoices.any(models.Invoice.deleted_at.is_(None))
     ).scalar()
     
     # Top customers by revenue
@@ -97,6 +115,8 @@ def get_customer_stats(db: Session, user_id: int):
         func.sum(models.Invoice.total).label("total_spent")
     ).join(models.Invoice).filter(
         models.Customer.user_id == user_id,
+        models.Customer.deleted_at.is_(None),
+        models.Invoice.deleted_at.is_(None),
         models.Invoice.status == models.InvoiceStatus.PAID
     ).group_by(
         models.Customer.id
@@ -125,15 +145,21 @@ def get_customer_stats(db: Session, user_id: int):
 def get_invoice(db: Session, invoice_id: int, user_id: int):
     return db.query(models.Invoice).filter(
         models.Invoice.id == invoice_id,
-        models.Invoice.user_id == user_id
+        models.Invoice.user_id == user_id,
+        models.Invoice.deleted_at.is_(None)
     ).first()
 
 def get_invoices(db: Session, user_id: int, skip: int = 0, limit: int = 100):
     # Get invoices that have valid customers
+    # Load customers from the join and items in one extra query instead of per invoice
     invoices = db.query(models.Invoice).join(
         models.Customer, models.Invoice.customer_id == models.Customer.id
+    ).options(
+        contains_eager(models.Invoice.customer),
+        selectinload(models.Invoice.items)
     ).filter(
-        models.Invoice.user_id == user_id
+        models.Invoice.user_id == user_id,
+        models.Invoice.deleted_at.is_(None)
     ).order_by(models.Invoice.created_at.desc()).offset(skip).limit(limit).all()
     
     return invoices
@@ -260,22 +286,20 @@ def update_invoice(db: Session, invoice_id: int, invoice: schemas.InvoiceUpdate)
     return db_invoice
 
 def delete_invoice(db: Session, invoice_id: int):
-    # Get the invoice with eager loading of customer to avoid DetachedInstanceError
+    """Soft-delete an invoice; its items stay until app.purge removes both"""
     db_invoice = db.query(models.Invoice).filter(models.Invoice.id == invoice_id).first()
     
     if db_invoice:
-        # Store basic info before deletion for return value
+        # Store basic info for the return value
         invoice_info = {
             "id": db_invoice.id,
             "invoice_number": db_invoice.invoice_number,
             "status": db_invoice.status
         }
         
-        # Delete the invoice
-        db.delete(db_invoice)
+        db_invoice.deleted_at = datetime.now(timezone.utc)
         db.commit()
         
-        # Return basic info instead of the deleted object
         return invoice_info
     
     return None
@@ -321,8 +345,7 @@ def generate_invoice_pdf(db: Session, invoice_id: int):
     # This completely replaces the Enum object with a string
     invoice_copy.status = raw_status
     
-    print(f"DEBUG - Final status type: {type(invoice_copy.status)}")
-    print(f"DEBUG - Final status value: {invoice_copy.status}")
+    logger.debug("Rendering PDF for invoice %s with status %r", invoice_id, raw_status)
     
     # Generate PDF
     pdf_bytes = generate_pdf(invoice_copy, settings)
@@ -332,28 +355,33 @@ def generate_invoice_pdf(db: Session, invoice_id: int):
 def get_invoice_stats(db: Session, user_id: int):
     # Total invoices
     total_invoices = db.query(func.count(models.Invoice.id)).filter(
-        models.Invoice.user_id == user_id
+        models.Invoice.user_id == user_id,
+        models.Invoice.deleted_at.is_(None)
     ).scalar()
     
     # Invoices by status
     paid_invoices = db.query(func.count(models.Invoice.id)).filter(
         models.Invoice.user_id == user_id,
+        models.Invoice.deleted_at.is_(None),
         models.Invoice.status == models.InvoiceStatus.PAID
     ).scalar()
     
     pending_invoices = db.query(func.count(models.Invoice.id)).filter(
         models.Invoice.user_id == user_id,
+        models.Invoice.deleted_at.is_(None),
         models.Invoice.status == models.InvoiceStatus.PENDING
     ).scalar()
     
     overdue_invoices = db.query(func.count(models.Invoice.id)).filter(
         models.Invoice.user_id == user_id,
+        models.Invoice.deleted_at.is_(None),
         models.Invoice.status == models.InvoiceStatus.OVERDUE
     ).scalar()
     
     # Total revenue
     total_revenue = db.query(func.sum(models.Invoice.total)).filter(
         models.Invoice.user_id == user_id,
+        models.Invoice.deleted_at.is_(None),
         models.Invoice.status == models.InvoiceStatus.PAID
     ).scalar() or 0.0
     
@@ -362,6 +390,7 @@ def get_invoice_stats(db: Session, user_id: int):
     first_day_of_month = datetime(current_date.year, current_date.month, 1)
     revenue_this_month = db.query(func.sum(models.Invoice.total)).filter(
         models.Invoice.user_id == user_id,
+        models.Invoice.deleted_at.is_(None),
         models.Invoice.status == models.InvoiceStatus.PAID,
         models.Invoice.issue_date >= first_day_of_month
     ).scalar() or 0.0
@@ -373,6 +402,7 @@ def get_invoice_stats(db: Session, user_id: int):
     
     revenue_last_month = db.query(func.sum(models.Invoice.total)).filter(
         models.Invoice.user_id == user_id,
+        models.Invoice.deleted_at.is_(None),
         models.Invoice.status == models.InvoiceStatus.PAID,
         models.Invoice.issue_date >= first_day_of_last_month,
         models.Invoice.issue_date <= last_day_of_last_month
@@ -388,6 +418,7 @@ def get_invoice_stats(db: Session, user_id: int):
         
         month_revenue = db.query(func.sum(models.Invoice.total)).filter(
             models.Invoice.user_id == user_id,
+            models.Invoice.deleted_at.is_(None),
             models.Invoice.status == models.InvoiceStatus.PAID,
             models.Invoice.issue_date >= month_start,
             models.Invoice.issue_date <= month_end
@@ -413,31 +444,37 @@ def get_invoice_stats(db: Session, user_id: int):
 def get_dashboard_data(db: Session, user_id: int):
     # Get basic stats
     total_customers = db.query(func.count(models.Customer.id)).filter(
-        models.Customer.user_id == user_id
+        models.Customer.user_id == user_id,
+        models.Customer.deleted_at.is_(None)
     ).scalar()
     
     total_invoices = db.query(func.count(models.Invoice.id)).filter(
-        models.Invoice.user_id == user_id
+        models.Invoice.user_id == user_id,
+        models.Invoice.deleted_at.is_(None)
     ).scalar()
     
     paid_invoices = db.query(func.count(models.Invoice.id)).filter(
         models.Invoice.user_id == user_id,
+        models.Invoice.deleted_at.is_(None),
         models.Invoice.status == models.InvoiceStatus.PAID
     ).scalar()
     
     pending_invoices = db.query(func.count(models.Invoice.id)).filter(
         models.Invoice.user_id == user_id,
+        models.Invoice.deleted_at.is_(None),
         models.Invoice.status == models.InvoiceStatus.PENDING
     ).scalar()
     
     overdue_invoices = db.query(func.count(models.Invoice.id)).filter(
         models.Invoice.user_id == user_id,
+        models.Invoice.deleted_at.is_(None),
         models.Invoice.status == models.InvoiceStatus.OVERDUE
     ).scalar()
     
     # Total revenue
     total_revenue = db.query(func.sum(models.Invoice.total)).filter(
         models.Invoice.user_id == user_id,
+        models.Invoice.deleted_at.is_(None),
         models.Invoice.status == models.InvoiceStatus.PAID
     ).scalar() or 0.0
     
@@ -448,6 +485,7 @@ def get_dashboard_data(db: Session, user_id: int):
     # This month's revenue
     revenue_this_month = db.query(func.sum(models.Invoice.total)).filter(
         models.Invoice.user_id == user_id,
+        models.Invoice.deleted_at.is_(None),
         models.Invoice.status == models.InvoiceStatus.PAID,
         models.Invoice.issue_date >= first_day_of_month
     ).scalar() or 0.0
@@ -459,6 +497,7 @@ def get_dashboard_data(db: Session, user_id: int):
     
     revenue_last_month = db.query(func.sum(models.Invoice.total)).filter(
         models.Invoice.user_id == user_id,
+        models.Invoice.deleted_at.is_(None),
         models.Invoice.status == models.InvoiceStatus.PAID,
         models.Invoice.issue_date >= first_day_of_last_month,
         models.Invoice.issue_date <= last_day_of_last_month
@@ -492,6 +531,7 @@ def get_dashboard_data(db: Session, user_id: int):
         # Query for paid invoices in this month
         month_revenue = db.query(func.sum(models.Invoice.total)).filter(
             models.Invoice.user_id == user_id,
+            models.Invoice.deleted_at.is_(None),
             models.Invoice.status == models.InvoiceStatus.PAID,
             models.Invoice.issue_date >= month_start,
             models.Invoice.issue_date <= month_end
@@ -523,11 +563,11 @@ def get_dashboard_data(db: Session, user_id: int):
 
 # Settings CRUD operations
 def get_settings(db: Session, user_id: int):
-    # Debug: Print all settings records for this user
-    all_settings = db.query(models.Settings).filter(models.Settings.user_id == user_id).all()
-    print(f"Found {len(all_settings)} settings records for user {user_id}")
-    for i, s in enumerate(all_settings):
-        print(f"Settings {i+1}: id={s.id}, company_name={s.company_name}, updated_at={s.updated_at}")
+    # Listing every settings record costs a query, so only do it when debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        all_settings = db.query(models.Settings).filter(models.Settings.user_id == user_id).all()
+        logger.debug("Found %d settings records for user %s: %s", len(all_settings), user_id,
+                     [(s.id, s.company_name, s.updated_at) for s in all_settings])
     
     # Get the most recently updated settings
     settings = db.query(models.Settings).filter(
@@ -550,30 +590,20 @@ def create_settings(db: Session, settings: schemas.SettingsCreate, user_id: int)
 # Reset user data
 def reset_user_data(db: Session, user_id: int):
     """
-    Reset all data for a user:
+    Reset all data for a user in one transaction:
     - Delete all invoices and invoice items
     - Delete all customers
     - Delete all settings
     - Create default settings
+    Rows are removed with set-based DELETE statements, nothing is loaded into the session.
     """
     try:
-        # Delete all invoices (cascade will delete invoice items)
-        invoices = db.query(models.Invoice).filter(models.Invoice.user_id == user_id).all()
-        for invoice in invoices:
-            db.delete(invoice)
-        
-        # Delete all customers
-        customers = db.query(models.Customer).filter(models.Customer.user_id == user_id).all()
-        for customer in customers:
-            db.delete(customer)
-        
-        # Delete all settings
-        settings = db.query(models.Settings).filter(models.Settings.user_id == user_id).all()
-        for setting in settings:
-            db.delete(setting)
-        
-        # Commit the deletions
-        db.commit()
+        # Items have no user_id, so they are matched through their invoice
+        invoice_ids = select(models.Invoice.id).where(models.Invoice.user_id == user_id)
+        items = db.query(models.InvoiceItem).filter(models.InvoiceItem.invoice_id.in_(invoice_ids)).delete(synchronize_session=False)
+        invoices = db.query(models.Invoice).filter(models.Invoice.user_id == user_id).delete(synchronize_session=False)
+        customers = db.query(models.Customer).filter(models.Customer.user_id == user_id).delete(synchronize_session=False)
+        db.query(models.Settings).filter(models.Settings.user_id == user_id).delete(synchronize_session=False)
         
         # Create default settings
         default_settings = models.Settings(
@@ -597,28 +627,63 @@ def reset_user_data(db: Session, user_id: int):
         )
         db.add(default_settings)
         db.commit()
-        db.refresh(default_settings)
+        # Objects of this user still in the session were deleted behind its back
+        db.expire_all()
         
+        logger.info("Reset data for user %s: %d invoices, %d items, %d customers deleted", user_id, invoices, items, customers)
         return {"status": "success", "message": "All data has been reset to defaults"}
     except Exception as e:
         db.rollback()
-        print(f"Error resetting user data: {e}")
+        logger.exception("Error resetting data for user %s", user_id)
         raise
 
+def create_reset_job(db: Session, user_id: int):
+    db_job = models.ResetJob(user_id=user_id, status=models.ResetJobStatus.QUEUED)
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def get_reset_job(db: Session, job_id: int, user_id: int):
+    return db.query(models.ResetJob).filter(
+        models.ResetJob.id == job_id,
+        models.ResetJob.user_id == user_id
+    ).first()
+
+def run_reset_user_data(job_id: int):
+    """Run a scheduled reset in its own database session, for use as a background task"""
+    db = SessionLocal()
+    try:
+        job = db.query(models.ResetJob).filter(models.ResetJob.id == job_id).first()
+        try:
+            # Committed by reset_user_data together with the reset itself
+            job.status = models.ResetJobStatus.COMPLETED
+            job.finished_at = datetime.utcnow()
+            reset_user_data(db, job.user_id)
+        except Exception as e:
+            logger.exception("Background reset %s of user %s failed", job_id, job.user_id)
+            job = db.query(models.ResetJob).filter(models.ResetJob.id == job_id).first()
+            job.status = models.ResetJobStatus.FAILED
+            job.error = str(e)
+            job.finished_at = datetime.utcnow()
+            db.commit()
+    finally:
+        db.close()
+
 def update_settings(db: Session, settings: schemas.SettingsUpdate, user_id: int):
     # Get all settings for this user
     all_settings = db.query(models.Settings).filter(models.Settings.user_id == user_id).all()
-    print(f"Updating settings for user {user_id}, found {len(all_settings)} settings records")
+    logger.debug("Updating settings for user %s, found %d settings records", user_id, len(all_settings))
     
     # If there are multiple settings records, keep only the most recently updated one
     if len(all_settings) > 1:
-        print(f"Multiple settings found for user {user_id}, cleaning up...")
+        logger.warning("Multiple settings found for user %s, cleaning up", user_id)
         # Sort by updated_at (newest first)
         sorted_settings = sorted(all_settings, key=lambda s: s.updated_at if s.updated_at else s.created_at, reverse=True)
         
         # Keep the first one (most recent) and delete the rest
         for s in sorted_settings[1:]:
-            print(f"Deleting duplicate settings record id={s.id}, company_name={s.company_name}")
+            logger.info("Deleting duplicate settings record %s of user %s", s.id, user_id)
             db.delete(s)
         
         db.commit()
@@ -629,14 +694,14 @@ def update_settings(db: Session, settings: schemas.SettingsUpdate, user_id: int)
     
     # Update the settings
     if db_settings:
-        print(f"Updating settings id={db_settings.id}, company_name={db_settings.company_name} -> {settings.company_name}")
+        logger.debug("Updating settings %s of user %s", db_settings.id, user_id)
         for key, value in settings.dict(exclude_unset=True).items():
             setattr(db_settings, key, value)
         db.commit()
         db.refresh(db_settings)
     else:
         # Create new settings if none exist
-        print(f"No settings found for user {user_id}, creating new settings")
+        logger.info("No settings found for user %s, creating new settings", user_id)
         db_settings = models.Settings(**settings.dict(), user_id=user_id)
         db.add(db_settings)
         db.commit()
@@ -644,3 +709,51 @@ def update_settings(db: Session, settings: schemas.SettingsUpdate, user_id: int)
     
     return db_settings
 
+
+# Import job operations
+IMPORT_JOB_STALE_SECONDS = int(os.getenv("IMPORT_JOB_STALE_SECONDS", 600))
+
+# Failed runs in a row, without progress, after which a job is aborted for good
+IMPORT_JOB_MAX_ATTEMPTS = int(os.getenv("IMPORT_JOB_MAX_ATTEMPTS", 3))
+
+# Failed and aborted jobs are deleted, with their files, after this many seconds without progress
+IMPORT_JOB_EXPIRY_SECONDS = int(os.getenv("IMPORT_JOB_EXPIRY_SECONDS", 7 * 24 * 60 * 60))
+
+def create_import_job(db: Session, user_id: int, filename: str, file_path: str, format: str,
+                      options: schemas.ImportOptions):
+    db_job = models.ImportJob(
+        user_id=user_id,
+        filename=filename,
+        file_path=file_path,
+        format=format,
+        options=json.dumps(options.dict()),
+        status=models.ImportJobStatus.QUEUED,
+        phase="settings",
+        phase_offset=0
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def get_import_job(db: Session, job_id: int, user_id: int):
+    return db.query(models.ImportJob).filter(
+        models.ImportJob.id == job_id,
+        models.ImportJob.user_id == user_id
+    ).first()
+
+def get_import_jobs(db: Session, user_id: int, skip: int = 0, limit: int = 100):
+    return db.query(models.ImportJob).filter(
+        models.ImportJob.user_id == user_id
+    ).order_by(models.ImportJob.id.desc()).offset(skip).limit(limit).all()
+
+def seconds_since_progress(job: models.ImportJob):
+    last_progress = job.updated_at or job.created_at
+    if last_progress is None:
+        return float("inf")
+    now = datetime.now(timezone.utc) if last_progress.tzinfo else datetime.utcnow()
+    return (now - last_progress).total_seconds()
+
+def is_import_job_stale(job: models.ImportJob):
+    """A running job whose checkpoint has not moved for a while belongs to a dead worker"""
+    return seconds_since_progress(job) > IMPORT_JOB_STALE_SECONDS
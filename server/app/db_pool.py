@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy.engine import URL
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+# Connections kept open per engine and worker process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+
+# Extra connections opened above DB_POOL_SIZE under load, closed when returned
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+
+# Seconds to wait for a free connection before the request fails
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+
+# Seconds after which a connection is replaced, -1 keeps connections forever
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+
+# Test connections with a lightweight ping before handing them out
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Connect through PgBouncer in transaction mode: no client-side pool and no prepared statements
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+
+
+class PoolMetrics:
+    """Counters for connection checkouts and request sessions of one engine"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.sessions_open = 0
+        self.sessions_total = 0
+        self.session_time_total = 0.0
+        self.session_time_max = 0.0
+
+    def record_checkout(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.checkout_timeouts += 1
+            else:
+                self.checkouts += 1
+                self.checkout_wait_total += wait
+            self.checkout_wait_max = max(self.checkout_wait_max, wait)
+
+    def session_opened(self):
+        with self._lock:
+            self.sessions_open += 1
+
+    def session_closed(self, duration: float):
+        with self._lock:
+            self.sessions_open -= 1
+            self.sessions_total += 1
+            self.session_time_total += duration
+            self.session_time_max = max(self.session_time_max, duration)
+
+    def snapshot(self, pool) -> Dict[str, Any]:
+        with self._lock:
+            data = {
+                "pool": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "checkout_wait_avg_ms": round(self.checkout_wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 3),
+                "sessions_open": self.sessions_open,
+                "sessions_total": self.sessions_total,
+                "session_time_avg_ms": round(self.session_time_total / self.sessions_total * 1000, 3) if self.sessions_total else 0.0,
+                "session_time_max_ms": round(self.session_time_max * 1000, 3),
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+            })
+        return data
+
+
+class TimedPoolMixin:
+    """Measure how long each connection checkout waits for the pool"""
+
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_checkout(time.perf_counter() - start, timed_out=True)
+            raise
+        self.metrics.record_checkout(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def engine_options(url: URL) -> Dict[str, Any]:
+    """Keyword arguments for create_engine/create_async_engine from the pool settings"""
+    options: Dict[str, Any] = {"pool_pre_ping": DB_POOL_PRE_PING}
+
+    if DB_PGBOUNCER:
+        # PgBouncer owns the pooling, and transaction mode cannot keep prepared statements
+        options["poolclass"] = NullPool
+        if url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+        return options
+
+    if url.get_backend_name() == "sqlite":
+        # SQLite picks its own pool class per database type
+        return options
+
+    is_async = url.get_dialect().is_async
+    options.update({
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    })
+    return options
+
+
+def attach_metrics(engine, metrics: PoolMetrics):
+    """Make the engine's pool report checkout waits to the given metrics"""
+    engine.pool.metrics = metrics
@@ -8,8 +8,18 @@ from sqlalchemy.orm import Session, joinedload
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional, only needed for Parquet exports
+    pa = None
+    pq = None
+
 from app import models, schemas, crud
 
+# Number of rows fetched from the database and written per Parquet row group
+PARQUET_BATCH_SIZE = 5000
+
 
 class ExportService:
     def __init__(self, db: Session, user_id: int):
@@ -30,28 +40,24 @@ class ExportService:
         elif request.format == schemas.ExportFormat.BACKUP:
             data, filename = self._export_backup(request)
             return data, filename
+        elif request.format == schemas.ExportFormat.PARQUET:
+            data, filename = self._export_parquet(request)
+            return data, filename
         else:
             raise ValueError(f"Unsupported export format: {request.format}")
     
-    def _get_customers(self, request: schemas.ExportRequest) -> List[models.Customer]:
-        """Get customers based on request filters"""
-        query = self.db.query(models.Customer).filter(
-            models.Customer.user_id == self.user_id
-        )
+    def _filter_customers(self, query, request: schemas.ExportRequest):
+        """Apply the request's customer filters to a query"""
+        query = query.filter(models.Customer.user_id == self.user_id, models.Customer.deleted_at.is_(None))
         
         if request.customer_ids:
             query = query.filter(models.Customer.id.in_(request.customer_ids))
         
-        return query.all()
+        return query
     
-    def _get_invoices(self, request: schemas.ExportRequest) -> List[models.Invoice]:
-        """Get invoices based on request filters"""
-        query = self.db.query(models.Invoice).options(
-            joinedload(models.Invoice.items),
-            joinedload(models.Invoice.customer)
-        ).filter(
-            models.Invoice.user_id == self.user_id
-        )
+    def _filter_invoices(self, query, request: schemas.ExportRequest):
+        """Apply the request's invoice filters to a query"""
+        query = query.filter(models.Invoice.user_id == self.user_id, models.Invoice.deleted_at.is_(None))
         
         if request.date_from:
             query = query.filter(models.Invoice.issue_date >= request.date_from)
@@ -62,7 +68,19 @@ class ExportService:
         if request.customer_ids:
             query = query.filter(models.Invoice.customer_id.in_(request.customer_ids))
         
-        return query.all()
+        return query
+    
+    def _get_customers(self, request: schemas.ExportRequest) -> List[models.Customer]:
+        """Get customers based on request filters"""
+        return self._filter_customers(self.db.query(models.Customer), request).all()
+    
+    def _get_invoices(self, request: schemas.ExportRequest) -> List[models.Invoice]:
+        """Get invoices based on request filters"""
+        query = self.db.query(models.Invoice).options(
+            joinedload(models.Invoice.items),
+            joinedload(models.Invoice.customer)
+        )
+        return self._filter_invoices(query, request).all()
     
     def _export_json(self, request: schemas.ExportRequest) -> tuple[bytes, str]:
         """Export data as JSON with proper structure"""
@@ -453,12 +471,157 @@ Generated on: """ + datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
         
         return zip_buffer.getvalue(), filename
 
+    def _export_parquet(self, request: schemas.ExportRequest) -> tuple[bytes, str]:
+        """Export customers, invoices and invoice items as Parquet tables in a ZIP"""
+        if pa is None:
+            raise ValueError("Parquet export requires the 'pyarrow' package to be installed")
+        
+        timestamp_type = pa.timestamp("us", tz="UTC")
+        zip_buffer = io.BytesIO()
+        
+        # Parquet files are already compressed, so store them without deflating again
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_STORED) as zip_file:
+            
+            if request.include_customers:
+                schema = pa.schema([
+                    ("id", pa.int64()),
+                    ("name", pa.string()),
+                    ("email", pa.string()),
+                    ("company", pa.string()),
+                    ("phone", pa.string()),
+                    ("address", pa.string()),
+                    ("city", pa.string()),
+                    ("state", pa.string()),
+                    ("zip_code", pa.string()),
+                    ("country", pa.string()),
+                    ("notes", pa.string()),
+                    ("created_at", timestamp_type),
+                    ("updated_at", timestamp_type),
+                ])
+                query = self._filter_customers(self.db.query(
+                    models.Customer.id,
+                    models.Customer.name,
+                    models.Customer.email,
+                    models.Customer.company,
+                    models.Customer.phone,
+                    models.Customer.address,
+                    models.Customer.city,
+                    models.Customer.state,
+                    models.Customer.zip_code,
+                    models.Customer.country,
+                    models.Customer.notes,
+                    models.Customer.created_at,
+                    models.Customer.updated_at
+                ), request).order_by(models.Customer.id)
+                
+                zip_file.writestr("customers.parquet", self._write_parquet(query, schema))
+            
+            if request.include_invoices:
+                schema = pa.schema([
+                    ("id", pa.int64()),
+                    ("invoice_number", pa.string()),
+                    ("customer_id", pa.int64()),
+                    ("customer_email", pa.string()),
+                    ("issue_date", timestamp_type),
+                    ("due_date", timestamp_type),
+                    ("status", pa.string()),
+                    ("notes", pa.string()),
+                    ("subtotal", pa.float64()),
+                    ("tax_rate", pa.float64()),
+                    ("tax_amount", pa.float64()),
+                    ("discount", pa.float64()),
+                    ("total", pa.float64()),
+                    ("created_at", timestamp_type),
+                    ("updated_at", timestamp_type),
+                ])
+                query = self._filter_invoices(self.db.query(
+                    models.Invoice.id,
+                    models.Invoice.invoice_number,
+                    models.Invoice.customer_id,
+                    models.Customer.email,
+                    models.Invoice.issue_date,
+                    models.Invoice.due_date,
+                    models.Invoice.status,
+                    models.Invoice.notes,
+                    models.Invoice.subtotal,
+                    models.Invoice.tax_rate,
+                    models.Invoice.tax_amount,
+                    models.Invoice.discount,
+                    models.Invoice.total,
+                    models.Invoice.created_at,
+                    models.Invoice.updated_at
+                ).outerjoin(
+                    models.Customer, models.Invoice.customer_id == models.Customer.id
+                ), request).order_by(models.Invoice.id)
+                
+                zip_file.writestr("invoices.parquet", self._write_parquet(query, schema))
+                
+                schema = pa.schema([
+                    ("id", pa.int64()),
+                    ("invoice_id", pa.int64()),
+                    ("invoice_number", pa.string()),
+                    ("description", pa.string()),
+                    ("quantity", pa.float64()),
+                    ("unit_price", pa.float64()),
+                    ("amount", pa.float64()),
+                ])
+                query = self._filter_invoices(self.db.query(
+                    models.InvoiceItem.id,
+                    models.InvoiceItem.invoice_id,
+                    models.Invoice.invoice_number,
+                    models.InvoiceItem.description,
+                    models.InvoiceItem.quantity,
+                    models.InvoiceItem.unit_price,
+                    models.InvoiceItem.amount
+                ).join(
+                    models.Invoice, models.InvoiceItem.invoice_id == models.Invoice.id
+                ), request).order_by(models.InvoiceItem.id)
+                
+                zip_file.writestr("invoice_items.parquet", self._write_parquet(query, schema))
+        
+        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        filename = f"bizify_export_{timestamp}_parquet.zip"
+        
+        return zip_buffer.getvalue(), filename
+    
+    def _write_parquet(self, query, schema) -> bytes:
+        """Stream query rows into a Parquet file, one row group per batch.
+        
+        The query's columns must be in the same order as the schema fields.
+        """
+        buffer = io.BytesIO()
+        
+        with pq.ParquetWriter(buffer, schema, compression="snappy") as writer:
+            batch = []
+            for row in query.yield_per(PARQUET_BATCH_SIZE):
+                batch.append(row)
+                if len(batch) >= PARQUET_BATCH_SIZE:
+                    writer.write_table(self._rows_to_table(batch, schema))
+                    batch = []
+            
+            if batch:
+                writer.write_table(self._rows_to_table(batch, schema))
+        
+        return buffer.getvalue()
+    
+    def _rows_to_table(self, rows: list, schema) -> "pa.Table":
+        """Convert a batch of result rows into a typed Arrow table"""
+        columns = []
+        for field, values in zip(schema, zip(*rows)):
+            if pa.types.is_string(field.type):
+                # Enums (e.g. invoice status) are stored by value
+                values = [v.value if hasattr(v, "value") else v for v in values]
+            columns.append(pa.array(values, type=field.type))
+        
+        return pa.Table.from_arrays(columns, schema=schema)
+    
     def get_media_type(self, format: schemas.ExportFormat) -> str:
         """Get the appropriate media type for the export format"""
         media_types = {
             schemas.ExportFormat.JSON: "application/json",
             schemas.ExportFormat.CSV: "application/zip",
             schemas.ExportFormat.EXCEL: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            schemas.ExportFormat.BACKUP: "application/zip"
+            schemas.ExportFormat.BACKUP: "application/zip",
+            schemas.ExportFormat.PARQUET: "application/zip"
         }
         return media_types.get(format, "application/octet-stream")
\ No newline at end of file
@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+
+# How long a verified token maps to a cached user, 0 disables the cache
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", 60))
+
+# Maximum number of cached tokens, least recently used entries are evicted first
+AUTH_CACHE_MAX_SIZE = int(os.getenv("AUTH_CACHE_MAX_SIZE", 10000))
+
+
+class IdentityCache:
+    """Short-lived, size-bounded map from access tokens to user snapshots.
+
+    Entries hold a detached schemas.User, so a hit needs neither a JWT decode
+    nor a database query. An entry expires after the TTL or when its token
+    expires, whichever comes first. Entries of a user are dropped when a
+    session commits changes to the user row (e.g. is_active or the password);
+    bulk query updates bypass this. Each process has its own cache, so user
+    changes made by another worker become visible after at most the TTL.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, schemas.User]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, token: str) -> Optional[schemas.User]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return user
+
+    def set(self, token: str, user: schemas.User, token_expires_at: Optional[float] = None):
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl
+        if token_expires_at is not None:
+            expires_at = min(expires_at, token_expires_at)
+        with self._lock:
+            self._entries[token] = (expires_at, user)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int):
+        """Drop every cached token of a user, called after the user row changes"""
+        with self._lock:
+            stale = [token for token, (_, user) in self._entries.items() if user.id == user_id]
+            for token in stale:
+                del self._entries[token]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+identity_cache = IdentityCache(AUTH_CACHE_TTL_SECONDS, AUTH_CACHE_MAX_SIZE)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault("changed_user_ids", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models.User) and obj.id is not None:
+            changed.add(obj.id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    # Invalidate only once the change is visible, so a concurrent lookup cannot cache the old row again
+    for user_id in session.info.pop("changed_user_ids", ()):
+        identity_cache.invalidate_user(user_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("changed_user_ids", None)
@@ -0,0 +1,436 @@
+import abc
+import csv
+import io
+import zipfile
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Union
+
+import ijson
+from openpyxl import load_workbook
+
+# Top-level sections that can be arbitrarily large and are only ever streamed
+STREAMED_SECTIONS = ("customers", "invoices")
+
+# Parser events that open a new value (as opposed to map keys and end events)
+VALUE_START_EVENTS = ("start_map", "start_array", "string", "number", "boolean", "null")
+
+
+class ImportReader:
+    """Incrementally read Bizify export data from a JSON file or backup ZIP.
+
+    The source is parsed with ijson, so customers and invoices are yielded one
+    at a time and memory use does not grow with the size of the file. A first
+    scan collects the small top-level values (export_version, settings, ...)
+    and counts the streamed sections; each call to items() is another pass.
+    """
+
+    def __init__(self, source: Union[bytes, BinaryIO, str, Path], format: str, filename: str):
+        self.zip_file = None
+        self.data_file = None
+        self.is_object = False
+        self.header: Dict[str, Any] = {}
+        self.section_types: Dict[str, str] = {}
+        self.counts: Dict[str, int] = {section: 0 for section in STREAMED_SECTIONS}
+
+        # Paths (e.g. assembled chunked uploads) are opened and owned by the reader
+        self.owns_source = isinstance(source, (str, Path))
+        if self.owns_source:
+            self.source = open(source, 'rb')
+        elif isinstance(source, (bytes, bytearray)):
+            self.source = io.BytesIO(source)
+        else:
+            self.source = source
+
+        try:
+            if format.lower() == "json" or filename.endswith('.json'):
+                pass
+            elif format.lower() == "zip" or filename.endswith('.zip'):
+                self.zip_file = zipfile.ZipFile(self.source, 'r')
+                self.data_file = self._find_data_file()
+            else:
+                raise ValueError(f"Unsupported file format: {format}")
+
+            self._scan()
+        except Exception:
+            self.close()
+            raise
+
+    def _find_data_file(self) -> str:
+        """Find the JSON data file inside a backup ZIP"""
+        for filename in self.zip_file.namelist():
+            if filename.endswith('.json') and 'data' in filename.lower():
+                return filename
+
+        # Fallback to any JSON file
+        json_files = [f for f in self.zip_file.namelist() if f.endswith('.json')]
+        if json_files:
+            return json_files[0]
+
+        raise ValueError("No JSON data file found in ZIP archive")
+
+    @contextmanager
+    def _open(self) -> Iterator[BinaryIO]:
+        """Open a fresh binary stream positioned at the start of the JSON data"""
+        if self.zip_file is not None:
+            with self.zip_file.open(self.data_file) as f:
+                yield f
+        else:
+            self.source.seek(0)
+            yield self.source
+
+    def _scan(self):
+        """Collect top-level values and section sizes in one pass"""
+        with self._open() as f:
+            events = ijson.parse(f, use_float=True)
+
+            _, event, _ = next(events, (None, None, None))
+            if event != "start_map":
+                return
+            self.is_object = True
+
+            key = None
+            builder = None
+            depth = 0
+            for prefix, event, value in events:
+                if prefix == "" and event == "map_key":
+                    key = value
+                    continue
+                if prefix == "" and event == "end_map":
+                    break
+
+                if key in STREAMED_SECTIONS:
+                    if prefix == key and key not in self.section_types:
+                        self.section_types[key] = event
+                    elif prefix == f"{key}.item" and event in VALUE_START_EVENTS:
+                        self.counts[key] += 1
+                    continue
+
+                # Build small top-level values in full
+                if builder is None:
+                    builder = ijson.ObjectBuilder()
+                    self.section_types.setdefault(key, event)
+                builder.event(event, value)
+
+                if event in ("start_map", "start_array"):
+                    depth += 1
+                elif event in ("end_map", "end_array"):
+                    depth -= 1
+
+                if depth == 0:
+                    self.header[key] = builder.value
+                    builder = None
+
+    def has_section(self, key: str) -> bool:
+        """Whether the top-level object contains the given key"""
+        return key in self.section_types
+
+    def is_list(self, key: str) -> bool:
+        """Whether the given top-level key holds a JSON array"""
+        return self.section_types.get(key) == "start_array"
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        """Return a small top-level value such as export_version or settings"""
+        return self.header.get(key, default)
+
+    def items(self, key: str) -> Iterator[Any]:
+        """Yield the elements of a top-level array one at a time"""
+        if not self.is_list(key):
+            return
+
+        with self._open() as f:
+            yield from ijson.items(f, f"{key}.item", use_float=True)
+
+    def close(self):
+        if self.zip_file is not None:
+            self.zip_file.close()
+        if self.owns_source:
+            self.source.close()
+
+
+# Column headers of the CSV and Excel exports, mapped to import fields.
+# Headers are matched case-insensitively; unknown columns are ignored.
+CUSTOMER_COLUMNS = {
+    "name": "name",
+    "email": "email",
+    "company": "company",
+    "phone": "phone",
+    "address": "address",
+    "city": "city",
+    "state": "state",
+    "zip": "zip_code",
+    "zip code": "zip_code",
+    "country": "country",
+    "notes": "notes",
+}
+
+INVOICE_COLUMNS = {
+    "invoice number": "invoice_number",
+    "invoice #": "invoice_number",
+    "customer email": "customer_email",
+    "issue date": "issue_date",
+    "due date": "due_date",
+    "status": "status",
+    "subtotal": "subtotal",
+    "tax rate": "tax_rate",
+    "tax amount": "tax_amount",
+    "discount": "discount",
+    "total": "total",
+    "notes": "notes",
+}
+
+INVOICE_ITEM_COLUMNS = {
+    "invoice number": "invoice_number",
+    "invoice #": "invoice_number",
+    "description": "description",
+    "quantity": "quantity",
+    "unit price": "unit_price",
+    "amount": "amount",
+}
+
+# Rows of the "Company Settings" sheet of the Excel export
+SETTINGS_LABELS = {
+    "company name": "company_name",
+    "address": "company_address",
+    "city": "company_city",
+    "state": "company_state",
+    "zip code": "company_zip",
+    "country": "company_country",
+    "phone": "company_phone",
+    "email": "company_email",
+    "website": "company_website",
+    "tax rate": "tax_rate",
+    "currency": "currency",
+    "invoice prefix": "invoice_prefix",
+    "invoice footer": "invoice_footer",
+    "bank name": "bank_name",
+    "bank iban": "bank_iban",
+    "bank bic": "bank_bic",
+    "language": "language",
+}
+
+# Fields exported as "10.0%" that are imported as plain numbers
+PERCENT_FIELDS = ("tax_rate",)
+
+
+class TabularImportReader(abc.ABC):
+    """Base for readers of the CSV and Excel export layouts.
+
+    Offers the same interface as ImportReader. Customers and invoices are
+    streamed row by row; invoice items live in their own table and are
+    attached to invoices through an invoice_number -> items hash index that
+    is built on the first pass over the invoices.
+    """
+
+    # Table names in the source, per section
+    TABLES: Dict[str, str] = {}
+
+    def __init__(self):
+        self.is_object = True
+        self.header: Dict[str, Any] = {}
+        self.section_types: Dict[str, str] = {}
+        self.counts: Dict[str, int] = {section: 0 for section in STREAMED_SECTIONS}
+        self._items_index = None
+
+    @abc.abstractmethod
+    def _rows(self, table: str) -> Iterator[List[Any]]:
+        """Yield the rows of a table, header row first"""
+
+    @abc.abstractmethod
+    def _has_table(self, table: str) -> bool:
+        """Whether the source contains the table"""
+
+    def _scan(self):
+        """Count customers and invoices and load settings"""
+        for section in STREAMED_SECTIONS:
+            if self._has_table(self.TABLES[section]):
+                self.section_types[section] = "start_array"
+                self.counts[section] = sum(1 for _ in self._records(self.TABLES[section], self._columns(section)))
+
+    def _columns(self, section: str) -> Dict[str, str]:
+        return CUSTOMER_COLUMNS if section == "customers" else INVOICE_COLUMNS
+
+    def _clean(self, field: str, value: Any) -> Any:
+        """Normalise a cell value, returning None for empty cells"""
+        if isinstance(value, str):
+            value = value.strip()
+            if value == "":
+                return None
+            if field in PERCENT_FIELDS and value.endswith("%"):
+                value = value[:-1].strip()
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
+
+    def _records(self, table: str, columns: Dict[str, str]) -> Iterator[Dict[str, Any]]:
+        """Yield the rows of a table as dicts of import fields"""
+        rows = self._rows(table)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        fields = [columns.get(str(name).strip().lower()) if name is not None else None for name in header]
+        for row in rows:
+            if not any(cell not in (None, "") for cell in row):
+                continue
+            record = {}
+            for field, value in zip(fields, row):
+                if field is None:
+                    continue
+                value = self._clean(field, value)
+                # Empty cells are left out so import defaults apply
+                if value is not None:
+                    record[field] = value
+            yield record
+
+    def _load_items_index(self) -> Dict[str, List[Dict[str, Any]]]:
+        index = defaultdict(list)
+        table = self.TABLES["items"]
+        if self._has_table(table):
+            for item in self._records(table, INVOICE_ITEM_COLUMNS):
+                invoice_number = item.pop("invoice_number", None)
+                if invoice_number is not None:
+                    index[str(invoice_number)].append(item)
+        return index
+
+    def has_section(self, key: str) -> bool:
+        return key in self.section_types or key in self.header
+
+    def is_list(self, key: str) -> bool:
+        return self.section_types.get(key) == "start_array"
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        return self.header.get(key, default)
+
+    def items(self, key: str) -> Iterator[Any]:
+        if not self.is_list(key):
+            return
+
+        if key == "customers":
+            # All customer fields are text, even if a spreadsheet typed them as numbers
+            for customer in self._records(self.TABLES["customers"], CUSTOMER_COLUMNS):
+                yield {field: str(value) for field, value in customer.items()}
+            return
+
+        if self._items_index is None:
+            self._items_index = self._load_items_index()
+        for invoice in self._records(self.TABLES["invoices"], INVOICE_COLUMNS):
+            if "invoice_number" in invoice:
+                invoice["invoice_number"] = str(invoice["invoice_number"])
+            invoice["items"] = self._items_index.get(invoice.get("invoice_number"), [])
+            yield invoice
+
+    def close(self):
+        pass
+
+
+class CsvImportReader(TabularImportReader):
+    """Read the CSV export: a ZIP with customers.csv, invoices.csv and invoice_items.csv"""
+
+    TABLES = {
+        "customers": "customers.csv",
+        "invoices": "invoices.csv",
+        "items": "invoice_items.csv",
+    }
+
+    def __init__(self, zip_file: zipfile.ZipFile):
+        super().__init__()
+        self.zip_file = zip_file
+        self.names = {Path(name).name.lower(): name for name in zip_file.namelist()}
+        self._scan()
+
+    def _has_table(self, table: str) -> bool:
+        return table in self.names
+
+    def _rows(self, table: str) -> Iterator[List[Any]]:
+        with self.zip_file.open(self.names[table]) as f:
+            text = io.TextIOWrapper(f, encoding="utf-8-sig", newline="")
+            yield from csv.reader(text)
+
+    def close(self):
+        self.zip_file.close()
+
+
+class ExcelImportReader(TabularImportReader):
+    """Read the Excel export using openpyxl's streaming read-only mode"""
+
+    TABLES = {
+        "customers": "Customers",
+        "invoices": "Invoices",
+        "items": "Invoice Items",
+    }
+
+    def __init__(self, source: BinaryIO, owns_source: bool = False):
+        super().__init__()
+        self.source = source
+        self.owns_source = owns_source
+        self.workbook = None
+        try:
+            self.workbook = load_workbook(source, read_only=True, data_only=True)
+            self._scan()
+            self._load_settings()
+        except Exception:
+            self.close()
+            raise
+
+    def _has_table(self, table: str) -> bool:
+        return table in self.workbook.sheetnames
+
+    def _rows(self, table: str) -> Iterator[List[Any]]:
+        yield from self.workbook[table].iter_rows(values_only=True)
+
+    def _load_settings(self):
+        if not self._has_table("Company Settings"):
+            return
+
+        settings = {}
+        rows = self._rows("Company Settings")
+        next(rows, None)  # Header row
+        for row in rows:
+            if not row or row[0] is None:
+                continue
+            field = SETTINGS_LABELS.get(str(row[0]).strip().lower())
+            if field is not None:
+                settings[field] = self._clean(field, row[1] if len(row) > 1 else None)
+
+        if settings.get("tax_rate") is not None:
+            settings["tax_rate"] = float(settings["tax_rate"])
+        self.header["settings"] = settings
+
+    def close(self):
+        if self.workbook is not None:
+            self.workbook.close()
+        if self.owns_source:
+            self.source.close()
+
+
+def open_import_reader(source: Union[bytes, BinaryIO, str, Path], format: str, filename: str):
+    """Return a reader for an import file.
+
+    JSON files and backup ZIPs are read with ImportReader, ZIPs holding the
+    CSV export with CsvImportReader and .xlsx files with ExcelImportReader.
+    """
+    if format.lower() == "excel" or filename.endswith('.xlsx'):
+        if isinstance(source, (str, Path)):
+            return ExcelImportReader(open(source, 'rb'), owns_source=True)
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        return ExcelImportReader(source)
+
+    if format.lower() == "zip" or filename.endswith('.zip'):
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        zip_file = zipfile.ZipFile(source, 'r')
+        names = {Path(name).name.lower() for name in zip_file.namelist()}
+        has_json = any(name.endswith('.json') for name in names)
+        if not has_json and names & set(CsvImportReader.TABLES.values()):
+            try:
+                return CsvImportReader(zip_file)
+            except Exception:
+                zip_file.close()
+                raise
+        zip_file.close()
+
+    return ImportReader(source, format, filename)
@@ -1,14 +1,30 @@
 import json
-import csv
-import io
-import zipfile
+import os
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from itertools import islice
+from pathlib import Path
+from typing import List, Dict, Any, BinaryIO, Iterable, Iterator, Optional, Tuple, Union
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 from pydantic import ValidationError
 
 from app import models, schemas, crud
+from app.database import SessionLocal
 from app.auth import get_password_hash
+from app.import_reader import ImportReader, open_import_reader
+from app.upload_service import UploadService
+
+# Number of records read from the import file and written per bulk statement
+IMPORT_BATCH_SIZE = 1000
+
+# Number of error and warning messages kept per import, further errors are only counted
+MAX_JOB_MESSAGES = 100
+
+# Customer columns that are copied from import data
+CUSTOMER_FIELDS = (
+    "name", "phone", "address", "city", "state",
+    "zip_code", "country", "company", "notes"
+)
 
 
 class ImportService:
@@ -16,88 +32,124 @@ class ImportService:
         self.db = db
         self.user_id = user_id
         self.errors = []
+        self.error_count = 0
         self.warnings = []
         self.import_stats = schemas.ImportStats()
+        # Set while running a background job, see run_job()
+        self.job = None
+    
+    def _add_error(self, message: str):
+        """Count an error, keeping only the first MAX_JOB_MESSAGES messages"""
+        self.error_count += 1
+        if len(self.errors) < MAX_JOB_MESSAGES:
+            self.errors.append(message)
+    
+    def _add_warning(self, message: str):
+        if len(self.warnings) < MAX_JOB_MESSAGES:
+            self.warnings.append(message)
     
-    def preview_import(self, file_data: bytes, format: str, filename: str) -> schemas.ImportPreview:
+    def preview_import(self, file_data: Union[bytes, BinaryIO, str, Path], format: str, filename: str) -> schemas.ImportPreview:
         """Preview import without making changes"""
+        reader = None
         try:
-            # Parse the file
-            data = self._parse_file(file_data, format, filename)
+            # Open the file for streaming
+            reader = open_import_reader(file_data, format, filename)
             
             # Validate data structure
-            validation_errors = self._validate_data_structure(data)
+            validation_errors = self._validate_data_structure(reader)
+            missing_errors = []
             
             # Check for conflicts and issues
             conflicts = []
             warnings = []
             
-            # Check customers
-            total_customers = 0
-            if "customers" in data:
-                total_customers = len(data["customers"])
-                for customer in data["customers"]:
+            customer_query = self.db.query(models.Customer.email, models.Customer.name).filter(
+                models.Customer.user_id == self.user_id,
+                models.Customer.deleted_at.is_(None)
+            )
+            invoice_query = self.db.query(models.Invoice.invoice_number, models.Invoice.status).filter(
+                models.Invoice.user_id == self.user_id,
+                models.Invoice.deleted_at.is_(None)
+            )
+            
+            # Check customers, one batch of the file at a time so each batch
+            # is resolved against the database with chunked IN (...) queries
+            import_emails = set()
+            for batch in self._batches(enumerate(reader.items("customers"), 1)):
+                pending = []
+                for i, customer in batch:
+                    validation_errors.extend(self._validate_customer(i, customer))
+                    if not isinstance(customer, dict):
+                        continue
                     if not customer.get("email"):
-                        validation_errors.append(f"Customer '{customer.get('name', 'Unknown')}' missing email")
+                        missing_errors.append(f"Customer '{customer.get('name', 'Unknown')}' missing email")
                         continue
-                    
-                    existing = self.db.query(models.Customer).filter(
-                        models.Customer.email == customer["email"],
-                        models.Customer.user_id == self.user_id
-                    ).first()
-                    
-                    if existing:
+                    import_emails.add(customer["email"])
+                    pending.append((customer["email"], customer.get("name", "")))
+                
+                existing_customers = {}
+                for email, name in self._query_in_chunks(customer_query, models.Customer.email, {e for e, _ in pending}):
+                    existing_customers.setdefault(email, name)
+                
+                for email, name in pending:
+                    if email in existing_customers:
                         conflicts.append({
                             "type": "customer",
-                            "identifier": customer["email"],
-                            "existing_name": existing.name,
-                            "new_name": customer.get("name", ""),
+                            "identifier": email,
+                            "existing_name": existing_customers[email],
+                            "new_name": name,
                             "action": "update"
                         })
             
             # Check invoices
-            total_invoices = 0
-            if "invoices" in data:
-                total_invoices = len(data["invoices"])
-                for invoice in data["invoices"]:
+            for batch in self._batches(enumerate(reader.items("invoices"), 1)):
+                pending = []
+                for i, invoice in batch:
+                    validation_errors.extend(self._validate_invoice(i, invoice))
+                    if not isinstance(invoice, dict):
+                        continue
                     if not invoice.get("invoice_number"):
-                        validation_errors.append(f"Invoice missing invoice_number")
+                        missing_errors.append(f"Invoice missing invoice_number")
                         continue
-                    
-                    existing = self.db.query(models.Invoice).filter(
-                        models.Invoice.invoice_number == invoice["invoice_number"],
-                        models.Invoice.user_id == self.user_id
-                    ).first()
-                    
-                    if existing:
+                    pending.append(invoice)
+                
+                existing_invoices = {}
+                invoice_numbers = {invoice["invoice_number"] for invoice in pending}
+                for invoice_number, status in self._query_in_chunks(invoice_query, models.Invoice.invoice_number, invoice_numbers):
+                    existing_invoices.setdefault(invoice_number, status)
+                
+                # Customers referenced by invoices only need to exist somewhere
+                referenced_emails = {invoice.get("customer_email") for invoice in pending} - import_emails
+                referenced_emails.discard(None)
+                known_emails = {
+                    email for email, _ in self._query_in_chunks(customer_query, models.Customer.email, referenced_emails)
+                }
+                
+                for invoice in pending:
+                    if invoice["invoice_number"] in existing_invoices:
                         conflicts.append({
                             "type": "invoice",
                             "identifier": invoice["invoice_number"],
-                            "existing_status": existing.status.value,
+                            "existing_status": existing_invoices[invoice["invoice_number"]].value,
                             "new_status": invoice.get("status", ""),
                             "action": "skip or update"
                         })
                     
                     # Check if customer exists
                     customer_email = invoice.get("customer_email")
-                    if customer_email:
-                        customer_in_import = any(
-                            c.get("email") == customer_email 
-                            for c in data.get("customers", [])
+                    if customer_email and customer_email not in import_emails and customer_email not in known_emails:
+                        warnings.append(
+                            f"Invoice {invoice['invoice_number']} references "
+                            f"customer {customer_email} which doesn't exist"
                         )
-                        customer_in_db = self.db.query(models.Customer).filter(
-                            models.Customer.email == customer_email,
-                            models.Customer.user_id == self.user_id
-                        ).first()
-                        
-                        if not customer_in_import and not customer_in_db:
-                            warnings.append(
-                                f"Invoice {invoice['invoice_number']} references "
-                                f"customer {customer_email} which doesn't exist"
-                            )
+            
+            validation_errors.extend(missing_errors)
+            total_customers = reader.counts["customers"]
+            total_invoices = reader.counts["invoices"]
             
             # Check settings
-            has_settings = "settings" in data and data["settings"] is not None
+            settings_data = reader.get("settings")
+            has_settings = settings_data is not None
             if has_settings:
                 existing_settings = crud.get_settings(self.db, self.user_id)
                 if existing_settings:
@@ -105,7 +157,7 @@ class ImportService:
                         "type": "settings",
                         "identifier": "company_settings",
                         "existing_company": existing_settings.company_name,
-                        "new_company": data["settings"].get("company_name", ""),
+                        "new_company": settings_data.get("company_name", ""),
                         "action": "replace"
                     })
             
@@ -127,39 +179,47 @@ class ImportService:
                 validation_errors=[f"Failed to parse file: {str(e)}"],
                 warnings=[]
             )
+        finally:
+            if reader is not None:
+                reader.close()
     
-    def import_data(self, file_data: bytes, format: str, filename: str, options: schemas.ImportOptions) -> schemas.ImportResult:
+    def import_data(self, file_data: Union[bytes, BinaryIO, str, Path], format: str, filename: str, options: schemas.ImportOptions) -> schemas.ImportResult:
         """Import data with transaction support"""
+        reader = None
         try:
             # Reset stats and errors
             self.errors = []
+            self.error_count = 0
             self.warnings = []
             self.import_stats = schemas.ImportStats()
             
-            # Parse the file
-            data = self._parse_file(file_data, format, filename)
+            # Open the file for streaming
+            reader = open_import_reader(file_data, format, filename)
+            if not reader.is_object:
+                raise ValueError("Invalid data format: expected JSON object")
             
             # Validate version compatibility
-            if "export_version" in data:
-                self._validate_version(data["export_version"])
+            if reader.has_section("export_version"):
+                self._validate_version(reader.get("export_version"))
             
             # Start transaction
             # Import settings first
-            if "settings" in data and options.import_settings and data["settings"]:
-                self._import_settings(data["settings"])
+            settings_data = reader.get("settings")
+            if settings_data and options.import_settings:
+                self._import_settings(settings_data)
             
             # Import customers (invoices depend on them)
             customer_map = {}
-            if "customers" in data and options.import_customers:
+            if reader.has_section("customers") and options.import_customers:
                 customer_map = self._import_customers(
-                    data["customers"], 
+                    reader.items("customers"), 
                     options.update_existing
                 )
             
             # Import invoices
-            if "invoices" in data and options.import_invoices:
+            if reader.has_section("invoices") and options.import_invoices:
                 self._import_invoices(
-                    data["invoices"], 
+                    reader.items("invoices"), 
                     customer_map,
                     options.skip_duplicates,
                     options.update_existing
@@ -170,7 +230,7 @@ class ImportService:
                 self.db.rollback()
                 return schemas.ImportResult(
                     success=False,
-                    message=f"Import failed with {len(self.errors)} error(s)",
+                    message=f"Import failed with {self.error_count} error(s)",
                     stats=self.import_stats,
                     errors=self.errors,
                     warnings=self.warnings
@@ -212,7 +272,7 @@ class ImportService:
             # Add the main error if not already present in self.errors
             error_msg = str(e)
             if error_msg not in self.errors:
-                self.errors.append(error_msg)
+                self._add_error(error_msg)
             
             return schemas.ImportResult(
                 success=False,
@@ -221,37 +281,119 @@ class ImportService:
                 errors=self.errors,
                 warnings=self.warnings
             )
+        finally:
+            if reader is not None:
+                reader.close()
     
-    def _parse_file(self, file_data: bytes, format: str, filename: str) -> Dict[str, Any]:
-        """Parse uploaded file based on format"""
-        if format.lower() == "json" or filename.endswith('.json'):
-            return json.loads(file_data.decode('utf-8'))
-        elif format.lower() == "zip" or filename.endswith('.zip'):
-            return self._parse_zip_file(file_data)
+    def run_job(self, job: models.ImportJob):
+        """Run an import as a background job, committing after every batch.
+        
+        Progress and the position in the file are stored on the job in the
+        same transaction as each batch, so a job that crashed or failed can
+        be run again and continues after the last committed batch.
+        """
+        self.job = job
+        options = schemas.ImportOptions(**json.loads(job.options or "{}"))
+        self.errors = json.loads(job.errors or "[]")
+        self.error_count = job.error_count or 0
+        self.warnings = json.loads(job.warnings or "[]")
+        self.import_stats = schemas.ImportStats(**json.loads(job.stats or "{}"))
+        
+        reader = open_import_reader(job.file_path, job.format, job.filename)
+        try:
+            if not reader.is_object:
+                raise ValueError("Invalid data format: expected JSON object")
+            if reader.has_section("export_version"):
+                self._validate_version(reader.get("export_version"))
+            
+            job.total_customers = reader.counts["customers"]
+            job.total_invoices = reader.counts["invoices"]
+            self.db.commit()
+            
+            if job.phase == "settings":
+                settings_data = reader.get("settings")
+                if settings_data and options.import_settings:
+                    self._import_settings(settings_data)
+                self._start_phase("customers")
+            
+            if job.phase == "customers":
+                self._phase_start = job.phase_offset
+                if reader.has_section("customers") and options.import_customers:
+                    self._import_customers(
+                        islice(reader.items("customers"), job.phase_offset, None),
+                        options.update_existing
+                    )
+                self._start_phase("invoices")
+            
+            if job.phase == "invoices":
+                self._phase_start = job.phase_offset
+                if reader.has_section("invoices") and options.import_invoices:
+                    # Customers were committed already, so they are loaded from the database
+                    self._import_invoices(
+                        islice(reader.items("invoices"), job.phase_offset, None),
+                        {},
+                        options.skip_duplicates,
+                        options.update_existing
+                    )
+                self._start_phase("done")
+        finally:
+            reader.close()
+    
+    def _start_phase(self, phase: str):
+        """Move the job checkpoint to the start of the next section and commit"""
+        if self.job.phase == "customers":
+            self.job.customers_done = self.job.total_customers
+        elif self.job.phase == "invoices":
+            self.job.invoices_done = self.job.total_invoices
+        
+        self.job.phase = phase
+        self.job.phase_offset = 0
+        self.job.failed_attempts = 0
+        self._save_job_progress()
+        self.db.commit()
+    
+    def _checkpoint(self, section: str, consumed: int):
+        """Commit the current batch together with the job's new position.
+        
+        consumed is the number of records of the section read by this run,
+        which started at self._phase_start. Outside of background jobs this
+        is a no-op and the import stays in a single transaction.
+        """
+        if self.job is None:
+            return
+        
+        position = self._phase_start + consumed
+        self.job.phase_offset = position
+        self.job.failed_attempts = 0
+        if section == "customers":
+            self.job.customers_done = position
         else:
-            raise ValueError(f"Unsupported file format: {format}")
+            self.job.invoices_done = position
+        
+        self._save_job_progress()
+        self.db.commit()
+    
+    def _save_job_progress(self):
+        """Copy stats, errors and warnings onto the job row"""
+        self.job.stats = json.dumps(self.import_stats.dict())
+        self.job.error_count = self.error_count
+        self.job.errors = json.dumps(self.errors)
+        self.job.warnings = json.dumps(self.warnings)
     
-    def _parse_zip_file(self, file_data: bytes) -> Dict[str, Any]:
-        """Parse ZIP file (backup format)"""
-        with zipfile.ZipFile(io.BytesIO(file_data), 'r') as zip_file:
-            # Look for main data file
-            data_file = None
-            for filename in zip_file.namelist():
-                if filename.endswith('.json') and 'data' in filename.lower():
-                    data_file = filename
-                    break
-            
-            if not data_file:
-                # Fallback to any JSON file
-                json_files = [f for f in zip_file.namelist() if f.endswith('.json')]
-                if json_files:
-                    data_file = json_files[0]
-            
-            if not data_file:
-                raise ValueError("No JSON data file found in ZIP archive")
-            
-            with zip_file.open(data_file) as f:
-                return json.loads(f.read().decode('utf-8'))
+    def _batches(self, iterable: Iterable[Any]) -> Iterator[List[Any]]:
+        """Split an iterable into lists of at most IMPORT_BATCH_SIZE elements"""
+        iterator = iter(iterable)
+        while True:
+            batch = list(islice(iterator, IMPORT_BATCH_SIZE))
+            if not batch:
+                return
+            yield batch
+    
+    def _query_in_chunks(self, query, column, values):
+        """Yield the rows of query restricted to column IN values, chunk by chunk"""
+        values = list(values)
+        for start in range(0, len(values), IMPORT_BATCH_SIZE):
+            yield from query.filter(column.in_(values[start:start + IMPORT_BATCH_SIZE]))
     
     def _validate_version(self, version: str):
         """Validate export version compatibility"""
@@ -259,46 +401,48 @@ class ImportService:
         if version not in supported_versions:
             raise ValueError(f"Unsupported export version: {version}. Supported versions: {supported_versions}")
     
-    def _validate_data_structure(self, data: Dict[str, Any]) -> List[str]:
-        """Validate the basic structure of import data"""
+    def _validate_data_structure(self, reader: ImportReader) -> List[str]:
+        """Validate the top-level structure of import data"""
         errors = []
         
-        if not isinstance(data, dict):
+        if not reader.is_object:
             errors.append("Invalid data format: expected JSON object")
             return errors
         
-        # Check for required fields in customers
-        if "customers" in data:
-            if not isinstance(data["customers"], list):
-                errors.append("Customers data must be a list")
-            else:
-                for i, customer in enumerate(data["customers"]):
-                    if not isinstance(customer, dict):
-                        errors.append(f"Customer {i+1} must be an object")
-                        continue
-                    if not customer.get("name"):
-                        errors.append(f"Customer {i+1} missing required field: name")
-                    if not customer.get("email"):
-                        errors.append(f"Customer {i+1} missing required field: email")
+        if reader.has_section("customers") and not reader.is_list("customers"):
+            errors.append("Customers data must be a list")
         
-        # Check for required fields in invoices
-        if "invoices" in data:
-            if not isinstance(data["invoices"], list):
-                errors.append("Invoices data must be a list")
-            else:
-                for i, invoice in enumerate(data["invoices"]):
-                    if not isinstance(invoice, dict):
-                        errors.append(f"Invoice {i+1} must be an object")
-                        continue
-                    if not invoice.get("invoice_number"):
-                        errors.append(f"Invoice {i+1} missing required field: invoice_number")
-                    if not invoice.get("customer_email"):
-                        errors.append(f"Invoice {i+1} missing required field: customer_email")
-                    if "items" in invoice and not isinstance(invoice["items"], list):
-                        errors.append(f"Invoice {i+1} items must be a list")
+        if reader.has_section("invoices") and not reader.is_list("invoices"):
+            errors.append("Invoices data must be a list")
         
         return errors
     
+    def _validate_customer(self, index: int, customer: Any) -> List[str]:
+        """Check a customer from import data for required fields"""
+        if not isinstance(customer, dict):
+            return [f"Customer {index} must be an object"]
+        
+        errors = []
+        if not customer.get("name"):
+            errors.append(f"Customer {index} missing required field: name")
+        if not customer.get("email"):
+            errors.append(f"Customer {index} missing required field: email")
+        return errors
+    
+    def _validate_invoice(self, index: int, invoice: Any) -> List[str]:
+        """Check an invoice from import data for required fields"""
+        if not isinstance(invoice, dict):
+            return [f"Invoice {index} must be an object"]
+        
+        errors = []
+        if not invoice.get("invoice_number"):
+            errors.append(f"Invoice {index} missing required field: invoice_number")
+        if not invoice.get("customer_email"):
+            errors.append(f"Invoice {index} missing required field: customer_email")
+        if "items" in invoice and not isinstance(invoice["items"], list):
+            errors.append(f"Invoice {index} items must be a list")
+        return errors
+    
     def _import_settings(self, settings_data: Dict[str, Any]):
         """Import company settings"""
         try:
@@ -354,189 +498,414 @@ class ImportService:
             self.import_stats.settings_updated = True
             
         except Exception as e:
-            self.errors.append(f"Failed to import settings: {str(e)}")
+            self._add_error(f"Failed to import settings: {str(e)}")
     
-    def _import_customers(self, customers_data: List[Dict[str, Any]], update_existing: bool) -> Dict[str, int]:
-        """Import customers and return email->id mapping"""
-        customer_map = {}
+    def _import_customers(self, customers_data: Iterable[Dict[str, Any]], update_existing: bool) -> Dict[str, int]:
+        """Import customers in batches and return email->id mapping"""
+        # Load every existing customer for this user in one query. There is no
+        # unique constraint on (user_id, email), so conflicts are resolved
+        # against this map instead of with ON CONFLICT.
+        existing_rows = {}
+        query = self.db.query(
+            models.Customer.id,
+            models.Customer.email,
+            *[getattr(models.Customer, field) for field in CUSTOMER_FIELDS]
+        ).filter(
+            models.Customer.user_id == self.user_id,
+            models.Customer.deleted_at.is_(None)
+        ).order_by(models.Customer.id)
+        for row in query:
+            existing_rows.setdefault(row.email, row)
         
-        for customer_data in customers_data:
-            try:
-                email = customer_data.get("email")
-                if not email:
-                    self.errors.append(f"Customer '{customer_data.get('name', 'Unknown')}' missing email")
-                    continue
-                
-                # Check if customer exists
-                existing = self.db.query(models.Customer).filter(
-                    models.Customer.email == email,
-                    models.Customer.user_id == self.user_id
-                ).first()
-                
-                if existing:
-                    if update_existing:
-                        # Update existing customer
-                        existing.name = customer_data.get("name", existing.name)
-                        existing.phone = customer_data.get("phone", existing.phone)
-                        existing.address = customer_data.get("address", existing.address)
-                        existing.city = customer_data.get("city", existing.city)
-                        existing.state = customer_data.get("state", existing.state)
-                        existing.zip_code = customer_data.get("zip_code", existing.zip_code)
-                        existing.country = customer_data.get("country", existing.country)
-                        existing.company = customer_data.get("company", existing.company)
-                        existing.notes = customer_data.get("notes", existing.notes)
-                        
-                        self.import_stats.customers_updated += 1
-                    
-                    customer_map[email] = existing.id
-                else:
-                    # Create new customer
-                    new_customer = models.Customer(
-                        user_id=self.user_id,
-                        name=customer_data.get("name", ""),
-                        email=email,
-                        phone=customer_data.get("phone"),
-                        address=customer_data.get("address"),
-                        city=customer_data.get("city"),
-                        state=customer_data.get("state"),
-                        zip_code=customer_data.get("zip_code"),
-                        country=customer_data.get("country"),
-                        company=customer_data.get("company"),
-                        notes=customer_data.get("notes")
-                    )
-                    self.db.add(new_customer)
-                    self.db.flush()
-                    customer_map[email] = new_customer.id
-                    self.import_stats.customers_created += 1
-                    
-            except Exception as e:
-                self.errors.append(f"Error importing customer {customer_data.get('email', 'unknown')}: {str(e)}")
+        customer_map = {email: row.id for email, row in existing_rows.items()}
+        new_customers = {}
+        updates = {}
         
+        consumed = 0
+        for consumed, customer_data in enumerate(customers_data, 1):
+            if not isinstance(customer_data, dict):
+                self._add_error("Customer data must be an object")
+                continue
+            
+            email = customer_data.get("email")
+            if not email:
+                self._add_error(f"Customer '{customer_data.get('name', 'Unknown')}' missing email")
+                continue
+            
+            imported = {field: customer_data[field] for field in CUSTOMER_FIELDS if field in customer_data}
+            
+            if email in existing_rows:
+                if update_existing:
+                    existing = existing_rows[email]
+                    changes = {
+                        field: value for field, value in imported.items()
+                        if value != getattr(existing, field)
+                    }
+                    if changes:
+                        updates.setdefault(existing.id, {"id": existing.id}).update(changes)
+                    self.import_stats.customers_updated += 1
+            elif email in new_customers:
+                # Repeated email within the file: treat it like an existing customer
+                if update_existing:
+                    new_customers[email].update(imported)
+                    self.import_stats.customers_updated += 1
+            elif email in customer_map:
+                # Created by an earlier batch of this import
+                if update_existing:
+                    if imported:
+                        customer_id = customer_map[email]
+                        updates.setdefault(customer_id, {"id": customer_id}).update(imported)
+                    self.import_stats.customers_updated += 1
+            else:
+                new_customers[email] = {
+                    **{field: None for field in CUSTOMER_FIELDS},
+                    "name": "",
+                    **imported,
+                    "email": email,
+                    "user_id": self.user_id
+                }
+            
+            if len(new_customers) + len(updates) >= IMPORT_BATCH_SIZE:
+                if not self._write_customer_batch(new_customers, updates, customer_map):
+                    return customer_map
+                self._checkpoint("customers", consumed)
+                new_customers = {}
+                updates = {}
+        
+        if self._write_customer_batch(new_customers, updates, customer_map):
+            self._checkpoint("customers", consumed)
         return customer_map
     
-    def _import_invoices(self, invoices_data: List[Dict[str, Any]], customer_map: Dict[str, int], 
+    def _write_customer_batch(self, new_customers: Dict[str, Dict[str, Any]],
+                              updates: Dict[int, Dict[str, Any]], customer_map: Dict[str, int]) -> bool:
+        """Write a batch of customers and add the new ids to customer_map.
+        
+        Changed customers get one bulk UPDATE by primary key and new ones a
+        multi-row INSERT ... RETURNING.
+        """
+        try:
+            if updates:
+                self.db.execute(update(models.Customer), list(updates.values()))
+            
+            if new_customers:
+                result = self.db.execute(
+                    insert(models.Customer).returning(models.Customer.id, models.Customer.email),
+                    list(new_customers.values())
+                )
+                for customer_id, email in result:
+                    customer_map[email] = customer_id
+                self.import_stats.customers_created += len(new_customers)
+            
+            return True
+            
+        except Exception as e:
+            self._add_error(f"Failed to import customers: {str(e)}")
+            if self.job is not None:
+                raise
+            return False
+    
+    def _import_invoices(self, invoices_data: Iterable[Dict[str, Any]], customer_map: Dict[str, int], 
                         skip_duplicates: bool, update_existing: bool):
-        """Import invoices"""
-        for invoice_data in invoices_data:
-            try:
-                invoice_number = invoice_data.get("invoice_number")
-                customer_email = invoice_data.get("customer_email")
-                
-                if not invoice_number:
-                    self.errors.append("Invoice missing invoice_number")
-                    continue
-                
-                if not customer_email:
-                    self.errors.append(f"Invoice {invoice_number} missing customer_email")
-                    continue
-                
-                # Check if invoice already exists
-                existing_invoice = self.db.query(models.Invoice).filter(
-                    models.Invoice.invoice_number == invoice_number,
-                    models.Invoice.user_id == self.user_id
-                ).first()
-                
-                if existing_invoice:
-                    if skip_duplicates:
-                        self.warnings.append(f"Skipped duplicate invoice: {invoice_number}")
-                        continue
-                    elif not update_existing:
-                        self.errors.append(f"Invoice {invoice_number} already exists")
-                        continue
-                
-                # Find customer
-                customer_id = customer_map.get(customer_email)
-                if not customer_id:
-                    # Try to find in database
-                    customer = self.db.query(models.Customer).filter(
-                        models.Customer.email == customer_email,
-                        models.Customer.user_id == self.user_id
-                    ).first()
-                    if customer:
-                        customer_id = customer.id
-                    else:
-                        self.errors.append(f"Customer not found for invoice {invoice_number}: {customer_email}")
-                        continue
-                
-                # Parse dates
-                issue_date = None
-                due_date = None
-                
-                if invoice_data.get("issue_date"):
-                    try:
-                        issue_date = datetime.fromisoformat(invoice_data["issue_date"].replace('Z', '+00:00'))
-                    except ValueError:
-                        self.warnings.append(f"Invalid issue_date for invoice {invoice_number}")
-                
-                if invoice_data.get("due_date"):
-                    try:
-                        due_date = datetime.fromisoformat(invoice_data["due_date"].replace('Z', '+00:00'))
-                    except ValueError:
-                        self.warnings.append(f"Invalid due_date for invoice {invoice_number}")
+        """Import invoices and their items in batches"""
+        # Preload invoice numbers and customer emails so each invoice is
+        # resolved with dict lookups instead of per-row queries
+        existing_invoices = {}
+        query = self.db.query(models.Invoice.invoice_number, models.Invoice.id).filter(
+            models.Invoice.user_id == self.user_id,
+            models.Invoice.deleted_at.is_(None)
+        ).order_by(models.Invoice.id)
+        for invoice_number, invoice_id in query:
+            existing_invoices.setdefault(invoice_number, invoice_id)
+        
+        customer_ids = self._load_customer_ids()
+        customer_ids.update(customer_map)
+        
+        seen_numbers = set()
+        batch = []
+        consumed = 0
+        for consumed, invoice_data in enumerate(invoices_data, 1):
+            if not isinstance(invoice_data, dict):
+                self._add_error("Invoice data must be an object")
+                continue
+            
+            prepared = self._prepare_invoice(
+                invoice_data, customer_ids, existing_invoices, seen_numbers,
+                skip_duplicates, update_existing
+            )
+            if prepared is None:
+                continue
+            
+            batch.append(prepared)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                if not self._write_invoice_batch(batch):
+                    return
+                self._checkpoint("invoices", consumed)
+                batch = []
+        
+        if not batch or self._write_invoice_batch(batch):
+            self._checkpoint("invoices", consumed)
+    
+    def _load_customer_ids(self) -> Dict[str, int]:
+        """Return an email->id mapping of the user's existing customers"""
+        customer_ids = {}
+        query = self.db.query(models.Customer.email, models.Customer.id).filter(
+            models.Customer.user_id == self.user_id,
+            models.Customer.deleted_at.is_(None)
+        ).order_by(models.Customer.id)
+        for email, customer_id in query:
+            customer_ids.setdefault(email, customer_id)
+        return customer_ids
+    
+    def _prepare_invoice(self, invoice_data: Dict[str, Any], customer_ids: Dict[str, int],
+                         existing_invoices: Dict[str, int], seen_numbers: set,
+                         skip_duplicates: bool, update_existing: bool):
+        """Validate one invoice and convert it to column values.
+        
+        Returns a (existing_invoice_id, values, items) tuple, or None if the
+        invoice is skipped. existing_invoice_id is None for new invoices.
+        """
+        try:
+            invoice_number = invoice_data.get("invoice_number")
+            customer_email = invoice_data.get("customer_email")
+            
+            if not invoice_number:
+                self._add_error("Invoice missing invoice_number")
+                return None
+            
+            if not customer_email:
+                self._add_error(f"Invoice {invoice_number} missing customer_email")
+                return None
+            
+            # Check if invoice already exists (or was already seen in this file)
+            existing_invoice_id = existing_invoices.get(invoice_number)
+            if existing_invoice_id is not None or invoice_number in seen_numbers:
+                if skip_duplicates:
+                    self._add_warning(f"Skipped duplicate invoice: {invoice_number}")
+                    return None
+                elif not update_existing or invoice_number in seen_numbers:
+                    self._add_error(f"Invoice {invoice_number} already exists")
+                    return None
+            seen_numbers.add(invoice_number)
+            
+            # Find customer
+            customer_id = customer_ids.get(customer_email)
+            if not customer_id:
+                self._add_error(f"Customer not found for invoice {invoice_number}: {customer_email}")
+                return None
+            
+            # Parse dates
+            issue_date = None
+            due_date = None
+            
+            if invoice_data.get("issue_date"):
+                try:
+                    issue_date = datetime.fromisoformat(invoice_data["issue_date"].replace('Z', '+00:00'))
+                except ValueError:
+                    self._add_warning(f"Invalid issue_date for invoice {invoice_number}")
+            
+            if invoice_data.get("due_date"):
+                try:
+                    due_date = datetime.fromisoformat(invoice_data["due_date"].replace('Z', '+00:00'))
+                except ValueError:
+                    self._add_warning(f"Invalid due_date for invoice {invoice_number}")
+            
+            # Parse status
+            status = models.InvoiceStatus.DRAFT
+            if invoice_data.get("status"):
+                try:
+                    status = models.InvoiceStatus(invoice_data["status"])
+                except ValueError:
+                    self._add_warning(f"Invalid status for invoice {invoice_number}: {invoice_data['status']}")
+            
+            values = {
+                "customer_id": customer_id,
+                "issue_date": issue_date,
+                "due_date": due_date,
+                "status": status,
+                "notes": invoice_data.get("notes"),
+                "tax_rate": float(invoice_data.get("tax_rate", 0.0)),
+                "discount": float(invoice_data.get("discount", 0.0)),
+                "subtotal": float(invoice_data.get("subtotal", 0.0)),
+                "tax_amount": float(invoice_data.get("tax_amount", 0.0)),
+                "total": float(invoice_data.get("total", 0.0))
+            }
+            if existing_invoice_id is None:
+                values["invoice_number"] = invoice_number
+                values["user_id"] = self.user_id
+            
+            # Convert invoice items
+            items = []
+            for item_data in invoice_data.get("items", []):
+                try:
+                    items.append({
+                        "description": item_data.get("description", ""),
+                        "quantity": float(item_data.get("quantity", 1.0)),
+                        "unit_price": float(item_data.get("unit_price", 0.0)),
+                        "amount": float(item_data.get("amount", 0.0))
+                    })
+                except Exception as e:
+                    self._add_error(f"Failed to import item for invoice {invoice_number}: {str(e)}")
+            
+            return existing_invoice_id, values, items
+            
+        except Exception as e:
+            self._add_error(f"Failed to import invoice {invoice_data.get('invoice_number', 'unknown')}: {str(e)}")
+            return None
+    
+    def _write_invoice_batch(self, batch: List[Tuple[Optional[int], Dict[str, Any], List[Dict[str, Any]]]]) -> bool:
+        """Write a batch of prepared invoices and their items.
+        
+        New invoices are inserted with a multi-row INSERT ... RETURNING, updated
+        invoices get one bulk UPDATE and have their items replaced, and all
+        items of the batch are inserted with a single executemany.
+        """
+        new_invoices = [(values, items) for invoice_id, values, items in batch if invoice_id is None]
+        updated_invoices = [(invoice_id, values, items) for invoice_id, values, items in batch if invoice_id is not None]
+        item_rows = []
+        
+        try:
+            if updated_invoices:
+                self.db.execute(
+                    update(models.Invoice),
+                    [{"id": invoice_id, **values} for invoice_id, values, _ in updated_invoices]
+                )
                 
-                # Parse status
-                status = models.InvoiceStatus.DRAFT
-                if invoice_data.get("status"):
-                    try:
-                        status = models.InvoiceStatus(invoice_data["status"])
-                    except ValueError:
-                        self.warnings.append(f"Invalid status for invoice {invoice_number}: {invoice_data['status']}")
+                # Delete existing items, they are replaced by the imported ones
+                updated_ids = [invoice_id for invoice_id, _, _ in updated_invoices]
+                self.db.query(models.InvoiceItem).filter(
+                    models.InvoiceItem.invoice_id.in_(updated_ids)
+                ).delete(synchronize_session=False)
                 
-                if existing_invoice and update_existing:
-                    # Update existing invoice
-                    existing_invoice.customer_id = customer_id
-                    existing_invoice.issue_date = issue_date
-                    existing_invoice.due_date = due_date
-                    existing_invoice.status = status
-                    existing_invoice.notes = invoice_data.get("notes")
-                    existing_invoice.tax_rate = float(invoice_data.get("tax_rate", 0.0))
-                    existing_invoice.discount = float(invoice_data.get("discount", 0.0))
-                    existing_invoice.subtotal = float(invoice_data.get("subtotal", 0.0))
-                    existing_invoice.tax_amount = float(invoice_data.get("tax_amount", 0.0))
-                    existing_invoice.total = float(invoice_data.get("total", 0.0))
-                    
-                    # Delete existing items
-                    self.db.query(models.InvoiceItem).filter(
-                        models.InvoiceItem.invoice_id == existing_invoice.id
-                    ).delete()
-                    
-                    new_invoice = existing_invoice
-                else:
-                    # Create new invoice
-                    new_invoice = models.Invoice(
-                        invoice_number=invoice_number,
-                        customer_id=customer_id,
-                        user_id=self.user_id,
-                        issue_date=issue_date,
-                        due_date=due_date,
-                        status=status,
-                        notes=invoice_data.get("notes"),
-                        tax_rate=float(invoice_data.get("tax_rate", 0.0)),
-                        discount=float(invoice_data.get("discount", 0.0)),
-                        subtotal=float(invoice_data.get("subtotal", 0.0)),
-                        tax_amount=float(invoice_data.get("tax_amount", 0.0)),
-                        total=float(invoice_data.get("total", 0.0))
-                    )
-                    self.db.add(new_invoice)
-                    self.db.flush()
-                    
-                    self.import_stats.invoices_created += 1
+                for invoice_id, _, items in updated_invoices:
+                    item_rows.extend({**item, "invoice_id": invoice_id} for item in items)
+            
+            if new_invoices:
+                result = self.db.execute(
+                    insert(models.Invoice).returning(models.Invoice.id, models.Invoice.invoice_number),
+                    [values for values, _ in new_invoices]
+                )
+                new_ids = {invoice_number: invoice_id for invoice_id, invoice_number in result}
                 
-                # Import invoice items
-                items_data = invoice_data.get("items", [])
-                for item_data in items_data:
-                    try:
-                        new_item = models.InvoiceItem(
-                            invoice_id=new_invoice.id,
-                            description=item_data.get("description", ""),
-                            quantity=float(item_data.get("quantity", 1.0)),
-                            unit_price=float(item_data.get("unit_price", 0.0)),
-                            amount=float(item_data.get("amount", 0.0))
-                        )
-                        self.db.add(new_item)
-                        
-                    except Exception as e:
-                        self.errors.append(f"Failed to import item for invoice {invoice_number}: {str(e)}")
+                for values, items in new_invoices:
+                    invoice_id = new_ids[values["invoice_number"]]
+                    item_rows.extend({**item, "invoice_id": invoice_id} for item in items)
                 
-            except Exception as e:
-                self.errors.append(f"Failed to import invoice {invoice_data.get('invoice_number', 'unknown')}: {str(e)}")
\ No newline at end of file
+                self.import_stats.invoices_created += len(new_invoices)
+            
+            if item_rows:
+                self.db.execute(insert(models.InvoiceItem), item_rows)
+            
+            return True
+            
+        except Exception as e:
+            self._add_error(f"Failed to import invoices: {str(e)}")
+            if self.job is not None:
+                raise
+            return False
+
+
+def _remove_job_file(job: models.ImportJob):
+    if job.file_path and os.path.exists(job.file_path):
+        os.remove(job.file_path)
+
+
+def _fail_job(db: Session, job: models.ImportJob, message: str):
+    """Record a failed run of a job.
+    
+    The job stays resumable until it has failed IMPORT_JOB_MAX_ATTEMPTS
+    times without its checkpoint moving, e.g. on a batch that can never be
+    written; then it is aborted and its file removed.
+    """
+    errors = json.loads(job.errors or "[]")
+    if len(errors) < MAX_JOB_MESSAGES:
+        errors.append(message)
+    job.errors = json.dumps(errors)
+    job.error_count = (job.error_count or 0) + 1
+    job.failed_attempts = (job.failed_attempts or 0) + 1
+    if job.failed_attempts >= crud.IMPORT_JOB_MAX_ATTEMPTS:
+        job.status = models.ImportJobStatus.ABORTED
+        job.finished_at = datetime.utcnow()
+        _remove_job_file(job)
+    else:
+        job.status = models.ImportJobStatus.FAILED
+    db.commit()
+
+
+def release_stale_import_job(db: Session, job: models.ImportJob):
+    """Count a running job whose worker died as a failed run, so it can be claimed again"""
+    _fail_job(db, job, "The import was interrupted")
+
+
+def run_import_job(job_id: int):
+    """Run or resume a background import job in its own database session"""
+    db = SessionLocal()
+    try:
+        # Claim the job so two workers never run it at the same time
+        claimed = db.query(models.ImportJob).filter(
+            models.ImportJob.id == job_id,
+            models.ImportJob.status.in_([models.ImportJobStatus.QUEUED, models.ImportJobStatus.FAILED])
+        ).update({"status": models.ImportJobStatus.RUNNING}, synchronize_session=False)
+        db.commit()
+        if not claimed:
+            return
+        
+        job = db.query(models.ImportJob).filter(models.ImportJob.id == job_id).first()
+        try:
+            import_service = ImportService(db, job.user_id)
+            import_service.run_job(job)
+            
+            job.status = models.ImportJobStatus.COMPLETED
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            
+            _remove_job_file(job)
+        except Exception as e:
+            # Batches committed so far are kept and the job row still holds
+            # the matching checkpoint, so the job can be resumed from there
+            db.rollback()
+            job = db.query(models.ImportJob).filter(models.ImportJob.id == job_id).first()
+            _fail_job(db, job, str(e))
+    finally:
+        db.close()
+
+
+def expire_import_jobs():
+    """Delete failed and aborted jobs without progress for IMPORT_JOB_EXPIRY_SECONDS, and orphaned job files"""
+    db = SessionLocal()
+    try:
+        jobs = db.query(models.ImportJob).filter(
+            models.ImportJob.status.in_([models.ImportJobStatus.FAILED, models.ImportJobStatus.ABORTED])
+        ).all()
+        for job in jobs:
+            if crud.seconds_since_progress(job) > crud.IMPORT_JOB_EXPIRY_SECONDS:
+                _remove_job_file(job)
+                db.delete(job)
+        db.commit()
+        
+        referenced = {path for path, in db.query(models.ImportJob.file_path).filter(models.ImportJob.file_path.isnot(None))}
+        UploadService.cleanup_job_files(referenced)
+    finally:
+        db.close()
+
+
+def resume_interrupted_import_jobs():
+    """Run jobs left queued, or running on a worker that died, e.g. by a restart"""
+    db = SessionLocal()
+    try:
+        job_ids = []
+        jobs = db.query(models.ImportJob).filter(
+            models.ImportJob.status.in_([models.ImportJobStatus.QUEUED, models.ImportJobStatus.RUNNING])
+        ).order_by(models.ImportJob.id).all()
+        for job in jobs:
+            if job.status == models.ImportJobStatus.RUNNING:
+                if not crud.is_import_job_stale(job):
+                    continue
+                release_stale_import_job(db, job)
+                if job.status == models.ImportJobStatus.ABORTED:
+                    continue
+            job_ids.append(job.id)
+    finally:
+        db.close()
+    
+    for job_id in job_ids:
+        run_import_job(job_id)
@@ -0,0 +1,61 @@
+"""
+Create the database schema and run pending migrations.
+Run once per deployment before the API workers start:
+
+    python -m app.init_db
+
+Concurrent runs (e.g. several init containers) are serialized with a
+PostgreSQL advisory lock, so only one of them issues DDL at a time.
+"""
+
+import logging
+import os
+import sys
+from contextlib import contextmanager
+
+from sqlalchemy import text
+
+# Add the server directory to the path so the migrations package can be imported
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import models
+from app.database import engine
+from app.migration_manager import run_migrations
+
+logger = logging.getLogger(__name__)
+
+# Key of the advisory lock held while the schema is created or migrated
+SCHEMA_LOCK_ID = 8_214_031_177
+
+@contextmanager
+def schema_lock():
+    """Hold a session-level advisory lock on PostgreSQL, a no-op elsewhere"""
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+
+    with engine.connect() as connection:
+        logger.info("Waiting for the schema lock...")
+        connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": SCHEMA_LOCK_ID})
+        connection.commit()
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": SCHEMA_LOCK_ID})
+            connection.commit()
+
+def init_database():
+    """Create missing tables and apply pending migrations"""
+    with schema_lock():
+        logger.info("Creating database tables...")
+        models.Base.metadata.create_all(bind=engine)
+        version = run_migrations()
+        logger.info("Database schema is at version %s", version)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        init_database()
+    except Exception as e:
+        logger.error("Database initialization failed: %s", e)
+        sys.exit(1)
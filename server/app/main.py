@@ -1,33 +1,70 @@
-from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Form, Request, BackgroundTasks
 from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import importlib.util
+from contextlib import asynccontextmanager
+import asyncio
+import logging
 import os
-import sys
 
-from app.database import engine, get_db
-from app import models, schemas, crud
+from app.database import get_db, get_read_db, get_pool_status
+from app import models, schemas, crud, serializers
 from app.auth import auth_router, get_current_user
 from app.export_service import ExportService
-from app.import_service import ImportService
+from app.import_service import (
+    ImportService, expire_import_jobs, release_stale_import_job, resume_interrupted_import_jobs, run_import_job
+)
+from app.upload_service import UploadService, UploadOffsetError
+from app.utils.translations import preload_translations
+from app.metrics import MetricsMiddleware, PDF_RENDER_DURATION, EXPORT_DURATION, render_metrics
+from app.sql_profiler import SQLProfilerMiddleware
+from app.read_replicas import ReplicaStickinessMiddleware
+from app.logging_config import RequestIdMiddleware, setup_logging, shutdown_logging
+from app.purge import PURGE_INTERVAL_SECONDS, purge_worker
+
+logger = logging.getLogger(__name__)
+
+# Schema setup runs as a separate step (python -m app.init_db); this is only for local development
+DB_INIT_ON_STARTUP = os.getenv("DB_INIT_ON_STARTUP", "false").lower() == "true"
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_logging()
+    logger.info(
+        "CORS configuration",
+        extra={"origins": cors_origins, "methods": cors_methods, "headers": cors_headers, "credentials": cors_credentials}
+    )
+    if DB_INIT_ON_STARTUP:
+        from app.init_db import init_database
+        init_database()
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+    # Load the PDF translations now rather than on the first invoice download
+    preload_translations()
 
-# Run migrations
-try:
-    # Add the server directory to the path so we can import the migrations module
-    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    
-    # Import and run migrations using the migration manager
-    from app.migration_manager import run_migrations
-    run_migrations()
-except Exception as e:
-    print(f"Error running migrations: {e}")
+    # Background tasks do not survive a restart, pick up jobs they left behind
+    resume_task = asyncio.create_task(run_in_threadpool(resume_interrupted_import_jobs))
 
-app = FastAPI(title="Bizify API", description="Business Management API", version="0.1.0")
+    # Deletes only mark rows, this removes them in batches (PURGE_INTERVAL_SECONDS=0 disables it)
+    purge_task = asyncio.create_task(purge_worker()) if PURGE_INTERVAL_SECONDS > 0 else None
+
+    try:
+        yield
+    finally:
+        if purge_task is not None:
+            purge_task.cancel()
+        # Stops waiting for resumed imports; an import still running is resumed by the next start
+        resume_task.cancel()
+        shutdown_logging()
+
+app = FastAPI(
+    title="Bizify API",
+    description="Business Management API",
+    version="0.1.0",
+    default_response_class=serializers.JSONResponse,
+    lifespan=lifespan
+)
 
 # Configure CORS based on environment variables
 def get_cors_origins():
@@ -64,12 +101,6 @@ cors_methods = get_cors_methods()
 cors_headers = get_cors_headers()
 cors_credentials = os.getenv("CORS_CREDENTIALS", "true").lower() == "true"
 
-print(f"CORS Configuration:")
-print(f"  Origins: {cors_origins}")
-print(f"  Methods: {cors_methods}")
-print(f"  Headers: {cors_headers}")
-print(f"  Credentials: {cors_credentials}")
-
 app.add_middleware(
     CORSMiddleware,
     allow_origins=cors_origins,
@@ -78,6 +109,18 @@ app.add_middleware(
     allow_headers=cors_headers,
 )
 
+# Opt-in per-request SQL profiling (SQL_PROFILE=header or all)
+app.add_middleware(SQLProfilerMiddleware)
+
+# Keep clients that just wrote on the primary, across all workers (no-op without replicas)
+app.add_middleware(ReplicaStickinessMiddleware)
+
+# Record request latency, status codes and SQL usage per route
+app.add_middleware(MetricsMiddleware)
+
+# Tag every request and its log records with an id, outermost so all other layers see it
+app.add_middleware(RequestIdMiddleware)
+
 # Include routers
 app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
 
@@ -87,10 +130,22 @@ def read_root():
     return {"message": "Welcome to Bizify API"}
 
 # Health check endpoint
+# Health endpoints never open a database session, except to authenticate /health/db
 @app.get("/health")
-def health_check():
+async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics of this worker, or of all workers in multiprocess mode"""
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
+@app.get("/health/db")
+async def database_pool_status(current_user: schemas.User = Depends(get_current_user)):
+    """Connection pool usage and checkout wait times of this worker, for signed-in users only"""
+    return get_pool_status()
+
 # Version endpoint
 @app.get("/api/version")
 def get_app_version():
@@ -117,7 +172,7 @@ def get_default_user(db: Session):
 def create_customer(
     customer: schemas.CustomerCreate, 
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.User = Depends(get_current_user)
 ):
     return crud.create_customer(db=db, customer=customer, user_id=current_user.id)
 
@@ -125,16 +180,16 @@ def create_customer(
 def read_customers(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     customers = crud.get_customers(db, user_id=current_user.id, skip=skip, limit=limit)
-    return customers
+    return serializers.customers_response(customers)
 
 @app.get("/api/customers/stats", response_model=schemas.CustomerStats)
 def get_customer_stats(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     return crud.get_customer_stats(db=db, user_id=current_user.id)
 
@@ -142,19 +197,19 @@ def get_customer_stats(
 def read_customer(
     customer_id: int, 
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.User = Depends(get_current_user)
 ):
     customer = crud.get_customer(db, customer_id=customer_id, user_id=current_user.id)
     if customer is None:
         raise HTTPException(status_code=404, detail="Customer not found")
-    return customer
+    return serializers.customer_response(customer)
 
 @app.put("/api/customers/{customer_id}", response_model=schemas.Customer)
 def update_customer(
     customer_id: int, 
     customer: schemas.CustomerUpdate, 
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.User = Depends(get_current_user)
 ):
     db_customer = crud.get_customer(db, customer_id=customer_id, user_id=current_user.id)
     if db_customer is None:
@@ -165,7 +220,7 @@ def update_customer(
 def delete_customer(
     customer_id: int, 
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.User = Depends(get_current_user)
 ):
     db_customer = crud.get_customer(db, customer_id=customer_id, user_id=current_user.id)
     if db_customer is None:
@@ -177,24 +232,27 @@ def delete_customer(
 def create_invoice(
     invoice: schemas.InvoiceCreate, 
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.User = Depends(get_current_user)
 ):
+    # The customer must belong to the user and not be deleted
+    if crud.get_customer(db, customer_id=invoice.customer_id, user_id=current_user.id) is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
     return crud.create_invoice(db=db, invoice=invoice, user_id=current_user.id)
 
 @app.get("/api/invoices", response_model=List[schemas.Invoice])
 def read_invoices(
     skip: int = 0, 
     limit: int = 100, 
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     invoices = crud.get_invoices(db, user_id=current_user.id, skip=skip, limit=limit)
-    return invoices
+    return serializers.invoices_response(invoices)
 
 @app.get("/api/invoices/stats", response_model=schemas.InvoiceStats)
 def get_invoice_stats(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     return crud.get_invoice_stats(db=db, user_id=current_user.id)
 
@@ -202,7 +260,7 @@ def get_invoice_stats(
 def generate_invoice_pdf(
     invoice_id: int, 
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.User = Depends(get_current_user)
 ):
     # Get invoice with user_id check
     invoice = crud.get_invoice(db, invoice_id=invoice_id, user_id=current_user.id)
@@ -210,7 +268,8 @@ def generate_invoice_pdf(
         raise HTTPException(status_code=404, detail="Invoice not found")
     
     # Generate PDF and return it
-    pdf_bytes = crud.generate_invoice_pdf(db=db, invoice_id=invoice_id)
+    with PDF_RENDER_DURATION.time():
+        pdf_bytes = crud.generate_invoice_pdf(db=db, invoice_id=invoice_id)
     
     return Response(
         content=pdf_bytes,
@@ -224,30 +283,32 @@ def generate_invoice_pdf(
 def read_invoice(
     invoice_id: int, 
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.User = Depends(get_current_user)
 ):
     invoice = crud.get_invoice(db, invoice_id=invoice_id, user_id=current_user.id)
     if invoice is None:
         raise HTTPException(status_code=404, detail="Invoice not found")
-    return invoice
+    return serializers.invoice_response(invoice)
 
 @app.put("/api/invoices/{invoice_id}", response_model=schemas.Invoice)
 def update_invoice(
     invoice_id: int, 
     invoice: schemas.InvoiceUpdate, 
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.User = Depends(get_current_user)
 ):
     db_invoice = crud.get_invoice(db, invoice_id=invoice_id, user_id=current_user.id)
     if db_invoice is None:
         raise HTTPException(status_code=404, detail="Invoice not found")
+    if invoice.customer_id is not None and crud.get_customer(db, customer_id=invoice.customer_id, user_id=current_user.id) is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
     return crud.update_invoice(db=db, invoice_id=invoice_id, invoice=invoice)
 
 @app.delete("/api/invoices/{invoice_id}")
 def delete_invoice(
     invoice_id: int, 
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.User = Depends(get_current_user)
 ):
     db_invoice = crud.get_invoice(db, invoice_id=invoice_id, user_id=current_user.id)
     if db_invoice is None:
@@ -262,8 +323,8 @@ def delete_invoice(
 # Dashboard endpoints
 @app.get("/api/dashboard", response_model=schemas.DashboardData)
 def get_dashboard_data(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     return crud.get_dashboard_data(db=db, user_id=current_user.id)
 
@@ -271,7 +332,7 @@ def get_dashboard_data(
 @app.get("/api/settings", response_model=schemas.Settings)
 def get_settings(
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.User = Depends(get_current_user)
 ):
     settings = crud.get_settings(db=db, user_id=current_user.id)
     if settings is None:
@@ -301,7 +362,7 @@ def get_settings(
 def update_settings(
     settings: schemas.SettingsUpdate, 
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.User = Depends(get_current_user)
 ):
     db_settings = crud.get_settings(db=db, user_id=current_user.id)
     if db_settings is None:
@@ -311,8 +372,10 @@ def update_settings(
 
 @app.post("/api/settings/reset")
 def reset_user_data(
+    background_tasks: BackgroundTasks,
+    background: bool = False,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """
     Reset all user data to defaults:
@@ -320,20 +383,39 @@ def reset_user_data(
     - Delete all customers
     - Delete all settings
     - Create default settings
+    With background=true the reset runs after the response is sent, poll
+    GET /api/settings/reset/{job_id} for its outcome.
     """
+    if background:
+        job = crud.create_reset_job(db=db, user_id=current_user.id)
+        background_tasks.add_task(crud.run_reset_user_data, job.id)
+        return {"status": "scheduled", "message": "Your data will be reset to defaults shortly", "job_id": job.id}
     return crud.reset_user_data(db=db, user_id=current_user.id)
 
+@app.get("/api/settings/reset/{job_id}", response_model=schemas.ResetJob)
+def read_reset_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """Get the outcome of a background reset"""
+    job = crud.get_reset_job(db, job_id=job_id, user_id=current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Reset job not found")
+    return job
+
 # Export/Import endpoints
 @app.post("/api/export")
 def export_data(
     request: schemas.ExportRequest,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """Export data in requested format"""
     try:
         export_service = ExportService(db, current_user.id)
-        data, filename = export_service.export_data(request)
+        with EXPORT_DURATION.labels(request.format.value).time():
+            data, filename = export_service.export_data(request)
         media_type = export_service.get_media_type(request.format)
         
         return Response(
@@ -346,26 +428,27 @@ def export_data(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
+def get_import_format(filename: Optional[str]) -> str:
+    """Determine the import format from the file extension"""
+    if filename and filename.endswith('.zip'):
+        return "zip"
+    if filename and filename.endswith('.xlsx'):
+        return "excel"
+    return "json"
+
 @app.post("/api/import/preview", response_model=schemas.ImportPreview)
 async def preview_import(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """Preview import without making changes"""
     try:
-        contents = await file.read()
         import_service = ImportService(db, current_user.id)
+        format = get_import_format(file.filename)
         
-        # Determine format from file extension
-        format = "json"
-        if file.filename:
-            if file.filename.endswith('.zip'):
-                format = "zip"
-            elif file.filename.endswith('.json'):
-                format = "json"
-        
-        preview = import_service.preview_import(contents, format, file.filename or "")
+        # Pass the spooled upload file so the import is streamed from disk
+        preview = await run_in_threadpool(import_service.preview_import, file.file, format, file.filename or "")
         return preview
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Preview failed: {str(e)}")
@@ -379,20 +462,11 @@ async def import_data(
     import_invoices: bool = Form(True),
     skip_duplicates: bool = Form(True),
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: schemas.User = Depends(get_current_user)
 ):
     """Import data from uploaded file"""
     try:
-        contents = await file.read()
-        
-        # Determine format from file extension
-        format = "json"
-        if file.filename:
-            if file.filename.endswith('.zip'):
-                format = "zip"
-            elif file.filename.endswith('.json'):
-                format = "json"
-        
+        format = get_import_format(file.filename)
         import_service = ImportService(db, current_user.id)
         options = schemas.ImportOptions(
             update_existing=update_existing,
@@ -402,11 +476,217 @@ async def import_data(
             skip_duplicates=skip_duplicates
         )
         
-        result = import_service.import_data(contents, format, file.filename or "", options)
+        result = await run_in_threadpool(import_service.import_data, file.file, format, file.filename or "", options)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
 
+# Resumable chunked uploads for large imports
+@app.post("/api/import/uploads", response_model=schemas.UploadStatus)
+def create_import_upload(
+    upload: schemas.UploadCreate,
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """Start a chunked upload of an import file"""
+    try:
+        return UploadService(current_user.id).create_upload(upload.filename, upload.total_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/api/import/uploads/{upload_id}", response_model=schemas.UploadStatus)
+def get_import_upload(
+    upload_id: str,
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """Get the status of a chunked upload, including the offset to resume from"""
+    upload_status = UploadService(current_user.id).get_upload(upload_id)
+    if upload_status is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload_status
+
+@app.put("/api/import/uploads/{upload_id}", response_model=schemas.UploadStatus)
+async def put_import_upload_chunk(
+    upload_id: str,
+    offset: int,
+    request: Request,
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """Append the raw request body to an upload at the given byte offset"""
+    try:
+        upload_status = await UploadService(current_user.id).write_chunk(upload_id, offset, request.stream())
+    except UploadOffsetError as e:
+        raise HTTPException(status_code=409, detail=str(e), headers={"Upload-Offset": str(e.expected_offset)})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if upload_status is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return upload_status
+
+@app.post("/api/import/uploads/{upload_id}/preview", response_model=schemas.ImportPreview)
+def preview_import_upload(
+    upload_id: str,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """Preview a completed chunked upload without making changes"""
+    upload_service = UploadService(current_user.id)
+    upload_status = upload_service.get_upload(upload_id)
+    if upload_status is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    if not upload_status["complete"]:
+        raise HTTPException(status_code=409, detail="Upload is not complete", headers={"Upload-Offset": str(upload_status["offset"])})
+    
+    import_service = ImportService(db, current_user.id)
+    path = upload_service.get_upload_path(upload_id)
+    return import_service.preview_import(path, get_import_format(upload_status["filename"]), upload_status["filename"])
+
+@app.post("/api/import/uploads/{upload_id}/finalize", response_model=schemas.ImportResult)
+def finalize_import_upload(
+    upload_id: str,
+    finalize: schemas.UploadFinalize,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """Verify the checksum of a completed upload and import it"""
+    upload_service = UploadService(current_user.id)
+    upload_status = upload_service.get_upload(upload_id)
+    if upload_status is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    
+    try:
+        path = upload_service.finalize_upload(upload_id, finalize.sha256)
+    except UploadOffsetError as e:
+        raise HTTPException(status_code=409, detail="Upload is not complete", headers={"Upload-Offset": str(e.expected_offset)})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        import_service = ImportService(db, current_user.id)
+        options = schemas.ImportOptions(**finalize.dict(exclude={"sha256"}))
+        return import_service.import_data(path, get_import_format(upload_status["filename"]), upload_status["filename"], options)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Import failed: {str(e)}")
+    finally:
+        upload_service.delete_upload(upload_id)
+
+@app.delete("/api/import/uploads/{upload_id}")
+def delete_import_upload(
+    upload_id: str,
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """Abort a chunked upload and remove its data"""
+    if not UploadService(current_user.id).delete_upload(upload_id):
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return {"status": "success", "message": f"Upload {upload_id} deleted"}
+
+@app.post("/api/import/uploads/{upload_id}/job", response_model=schemas.ImportJob)
+def create_import_upload_job(
+    upload_id: str,
+    finalize: schemas.UploadFinalize,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """Verify the checksum of a completed upload and import it as a background job"""
+    upload_service = UploadService(current_user.id)
+    upload_status = upload_service.get_upload(upload_id)
+    if upload_status is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    
+    try:
+        upload_service.finalize_upload(upload_id, finalize.sha256)
+    except UploadOffsetError as e:
+        raise HTTPException(status_code=409, detail="Upload is not complete", headers={"Upload-Offset": str(e.expected_offset)})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    path = upload_service.move_to_job(upload_id)
+    options = schemas.ImportOptions(**finalize.dict(exclude={"sha256"}))
+    job = crud.create_import_job(
+        db, user_id=current_user.id, filename=upload_status["filename"], file_path=str(path),
+        format=get_import_format(upload_status["filename"]), options=options
+    )
+    background_tasks.add_task(run_import_job, job.id)
+    background_tasks.add_task(expire_import_jobs)
+    return job
+
+# Background import jobs
+@app.post("/api/import/jobs", response_model=schemas.ImportJob)
+def create_import_job(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    update_existing: bool = Form(False),
+    import_settings: bool = Form(True),
+    import_customers: bool = Form(True),
+    import_invoices: bool = Form(True),
+    skip_duplicates: bool = Form(True),
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """Import an uploaded file in the background, committing batch by batch"""
+    filename = file.filename or ""
+    path = UploadService(current_user.id).save_job_file(file.file, filename)
+    options = schemas.ImportOptions(
+        update_existing=update_existing,
+        import_settings=import_settings,
+        import_customers=import_customers,
+        import_invoices=import_invoices,
+        skip_duplicates=skip_duplicates
+    )
+    job = crud.create_import_job(
+        db, user_id=current_user.id, filename=filename, file_path=str(path),
+        format=get_import_format(filename), options=options
+    )
+    background_tasks.add_task(run_import_job, job.id)
+    background_tasks.add_task(expire_import_jobs)
+    return job
+
+@app.get("/api/import/jobs", response_model=List[schemas.ImportJob])
+def read_import_jobs(
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    return crud.get_import_jobs(db, user_id=current_user.id, skip=skip, limit=limit)
+
+@app.get("/api/import/jobs/{job_id}", response_model=schemas.ImportJob)
+def read_import_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """Get the progress of a background import job"""
+    job = crud.get_import_job(db, job_id=job_id, user_id=current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+@app.post("/api/import/jobs/{job_id}/resume", response_model=schemas.ImportJob)
+def resume_import_job(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(get_current_user)
+):
+    """Continue a failed or interrupted import job from its last checkpoint"""
+    job = crud.get_import_job(db, job_id=job_id, user_id=current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    if job.status == models.ImportJobStatus.COMPLETED:
+        raise HTTPException(status_code=409, detail="Import job already completed")
+    if job.status == models.ImportJobStatus.RUNNING:
+        if not crud.is_import_job_stale(job):
+            raise HTTPException(status_code=409, detail="Import job is still running")
+        # The worker running it died, release the job so it can be claimed again
+        release_stale_import_job(db, job)
+        db.refresh(job)
+    if job.status == models.ImportJobStatus.ABORTED:
+        raise HTTPException(status_code=409, detail="Import job failed too often and was aborted")
+    
+    background_tasks.add_task(run_import_job, job.id)
+    return job
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,136 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Latency buckets in seconds, from fast lookups up to large exports
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Buckets for the number of SQL queries issued by one request
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+HTTP_REQUESTS = Counter(
+    "bizify_http_requests_total", "HTTP requests by route and status code",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "bizify_http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route"], buckets=LATENCY_BUCKETS
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "bizify_http_requests_in_progress", "HTTP requests currently being served",
+    ["method"], multiprocess_mode="livesum"
+)
+DB_QUERY_DURATION = Histogram(
+    "bizify_db_query_duration_seconds", "Duration of single SQL statements",
+    buckets=LATENCY_BUCKETS
+)
+REQUEST_DB_QUERIES = Histogram(
+    "bizify_http_request_db_queries", "SQL statements issued per HTTP request",
+    ["route"], buckets=QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_DURATION = Histogram(
+    "bizify_http_request_db_duration_seconds", "Time spent in SQL per HTTP request",
+    ["route"], buckets=LATENCY_BUCKETS
+)
+PDF_RENDER_DURATION = Histogram(
+    "bizify_pdf_render_duration_seconds", "Time to render an invoice PDF",
+    buckets=LATENCY_BUCKETS
+)
+EXPORT_DURATION = Histogram(
+    "bizify_export_duration_seconds", "Time to build a data export",
+    ["format"], buckets=LATENCY_BUCKETS
+)
+
+
+class RequestStats:
+    """SQL totals of the request being served, collected by the engine hooks"""
+
+    __slots__ = ("queries", "db_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    DB_QUERY_DURATION.observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+
+
+class MetricsMiddleware:
+    """Record latency, status, in-flight count and SQL usage per route.
+
+    Routes are labelled with their path template (/api/invoices/{invoice_id}),
+    so label cardinality stays bounded; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            _request_stats.reset(token)
+
+            route = scope.get("route")
+            route_label = route.path if route is not None else "unmatched"
+            HTTP_REQUESTS.labels(method, route_label, str(status_code)).inc()
+            HTTP_REQUEST_DURATION.labels(method, route_label).observe(elapsed)
+            REQUEST_DB_QUERIES.labels(route_label).observe(stats.queries)
+            REQUEST_DB_DURATION.labels(route_label).observe(stats.db_time)
+
+
+def render_metrics():
+    """Return the metrics in Prometheus text format and its content type.
+
+    With several worker processes, set PROMETHEUS_MULTIPROC_DIR so the
+    values of all workers are aggregated.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -2,7 +2,7 @@ import os
 import importlib
 import logging
 from pathlib import Path
-from sqlalchemy import create_engine, Column, Integer, String, MetaData, Table, inspect
+from sqlalchemy import create_engine, Column, Integer, String, MetaData, Table, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -39,7 +39,7 @@ def get_applied_migrations():
     db = SessionLocal()
     try:
         # Query the migrations table
-        result = db.execute("SELECT version, name FROM migrations ORDER BY version")
+        result = db.execute(text("SELECT version, name FROM migrations ORDER BY version"))
         return {row[0]: row[1] for row in result}
     finally:
         db.close()
@@ -51,7 +51,7 @@ def record_migration(version, name):
         # Use current timestamp for applied_at
         now = datetime.now().isoformat()
         db.execute(
-            "INSERT INTO migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)",
+            text("INSERT INTO migrations (version, name, applied_at) VALUES (:version, :name, :applied_at)"),
             {"version": version, "name": name, "applied_at": now}
         )
         db.commit()
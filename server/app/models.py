@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, DateTime, Text, Enum
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, DateTime, Text, Enum, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -13,6 +13,19 @@ class InvoiceStatus(str, enum.Enum):
     OVERDUE = "overdue"
     CANCELLED = "cancelled"
 
+class ImportJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    # Failed IMPORT_JOB_MAX_ATTEMPTS times in a row, no longer resumed
+    ABORTED = "aborted"
+
+class ResetJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
 class User(Base):
     __tablename__ = "users"
 
@@ -28,8 +41,15 @@ class User(Base):
     invoices = relationship("Invoice", back_populates="user")
     settings = relationship("Settings", back_populates="user", uselist=False)
 
+# Rows with deleted_at set are soft-deleted: hidden everywhere and physically removed by app.purge
+LIVE_ROWS = text("deleted_at IS NULL")
+
 class Customer(Base):
     __tablename__ = "customers"
+    __table_args__ = (
+        # Partial index so listings and counts never visit soft-deleted rows
+        Index("ix_customers_user_id_live", "user_id", postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -45,16 +65,24 @@ class Customer(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    deleted_at = Column(DateTime(timezone=True), index=True)
 
     user = relationship("User", back_populates="customers")
     invoices = relationship("Invoice", back_populates="customer")
 
 class Invoice(Base):
     __tablename__ = "invoices"
+    __table_args__ = (
+        # Partial indexes for the invoice list (newest first) and the stats queries
+        Index("ix_invoices_user_id_created_at_live", "user_id", "created_at", postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS),
+        Index("ix_invoices_user_id_status_issue_date_live", "user_id", "status", "issue_date", postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS),
+        Index("ix_invoices_customer_id_live", "customer_id", postgresql_where=LIVE_ROWS, sqlite_where=LIVE_ROWS),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     invoice_number = Column(String, index=True)
-    customer_id = Column(Integer, ForeignKey("customers.id"))
+    # Plain index as well, the purge looks up deleted invoices of a customer too
+    customer_id = Column(Integer, ForeignKey("customers.id"), index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     issue_date = Column(DateTime(timezone=True), default=datetime.utcnow)
     due_date = Column(DateTime(timezone=True))
@@ -67,6 +95,7 @@ class Invoice(Base):
     total = Column(Float, default=0.0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    deleted_at = Column(DateTime(timezone=True), index=True)
 
     customer = relationship("Customer", back_populates="invoices")
     user = relationship("User", back_populates="invoices")
@@ -76,7 +105,7 @@ class InvoiceItem(Base):
     __tablename__ = "invoice_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    invoice_id = Column(Integer, ForeignKey("invoices.id"))
+    invoice_id = Column(Integer, ForeignKey("invoices.id"), index=True)
     description = Column(String)
     quantity = Column(Float, default=1.0)
     unit_price = Column(Float, default=0.0)
@@ -113,3 +142,44 @@ class Settings(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     user = relationship("User", back_populates="settings")
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    filename = Column(String)
+    file_path = Column(String)
+    format = Column(String)
+    options = Column(Text)  # JSON encoded ImportOptions
+    status = Column(Enum(ImportJobStatus), default=ImportJobStatus.QUEUED)
+    # Checkpoint: the section being imported and how many of its records are committed
+    phase = Column(String, default="settings")
+    phase_offset = Column(Integer, default=0)
+    total_customers = Column(Integer, default=0)
+    total_invoices = Column(Integer, default=0)
+    customers_done = Column(Integer, default=0)
+    invoices_done = Column(Integer, default=0)
+    stats = Column(Text)  # JSON encoded ImportStats
+    error_count = Column(Integer, default=0)
+    failed_attempts = Column(Integer, default=0)  # Failed runs since the checkpoint last moved
+    errors = Column(Text)  # JSON list, capped
+    warnings = Column(Text)  # JSON list, capped
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True))
+
+    user = relationship("User")
+
+class ResetJob(Base):
+    """A reset of a user's data scheduled to run in the background"""
+    __tablename__ = "reset_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
+    status = Column(Enum(ResetJobStatus), default=ResetJobStatus.QUEUED)
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True))
+
+    user = relationship("User")
@@ -1,5 +1,6 @@
 import io
 import base64
+import logging
 from datetime import datetime
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
@@ -10,6 +11,8 @@ from reportlab.pdfgen import canvas
 
 from app.utils.translations import get_translation, format_date, format_currency
 
+logger = logging.getLogger(__name__)
+
 def create_footer(canvas, doc, settings):
     """
     Create a footer for each page of the invoice
@@ -154,13 +157,13 @@ def generate_pdf(invoice, settings):
                     logo_data = base64.b64decode(encoded)
                     logo_path = io.BytesIO(logo_data)
                 except Exception as e:
-                    print(f"Error decoding logo: {e}")
+                    logger.warning("Error decoding logo: %s", e)
                     logo_path = None
             else:
                 # If not a data URL, assume it's a file path
                 logo_path = settings.company_logo
         except Exception as e:
-            print(f"Error processing logo: {e}")
+            logger.warning("Error processing logo: %s", e)
             logo_path = None
     
     if logo_path:
@@ -183,7 +186,7 @@ def generate_pdf(invoice, settings):
             
             header_data[0][0] = logo
         except Exception as e:
-            print(f"Error creating logo image: {e}")
+            logger.warning("Error creating logo image: %s", e)
             # If logo creation fails, fall back to text
             company_name = settings.company_name if settings and settings.company_name else 'Your Company'
             header_data[0][0] = Paragraph(f"<font size='14'><b>{company_name}</b></font>", styles['Normal'])
@@ -261,9 +264,6 @@ def generate_pdf(invoice, settings):
     # Invoice Details: Date, number, status
     # Extract the raw status value using multiple fallback methods
     try:
-        print(f"DEBUG - Initial invoice status type: {type(invoice.status)}")
-        print(f"DEBUG - Initial invoice status value: {invoice.status}")
-        
         # First check if status is directly a string
         if isinstance(invoice.status, str):
             status_value = invoice.status.lower()
@@ -285,10 +285,8 @@ def generate_pdf(invoice, settings):
         
         # Clean up the status value
         status_value = status_value.replace("'", "").replace('"', '').strip()
-        
-        print(f"DEBUG - Extracted status value: {status_value}")
     except Exception as e:
-        print(f"Error extracting status value: {e}")
+        logger.warning("Error extracting status value from %r: %s", invoice.status, e)
         status_value = 'draft'  # Default fallback
 
     # Direct hardcoded translations to avoid any dictionary issues
@@ -323,9 +321,6 @@ def generate_pdf(invoice, settings):
         language
     )
     
-    # Debug print to help diagnose status issues
-    print(f"Invoice status debug - Raw value: '{status_value}', Translated: '{status_translation}'")
-    
     # Create invoice details with paragraphs for wrapping - IMPORTANT: Use the translated status, not the raw object
     invoice_details = [
         [Paragraph(f"{number_label}:", styles['Normal']), Paragraph(invoice.invoice_number, styles['Normal'])],
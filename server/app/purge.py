@@ -0,0 +1,106 @@
+"""
+Physically remove soft-deleted invoices and customers.
+Deleting through the API only sets deleted_at, so requests return at once
+whatever the size of the graph. The rows are removed here in small batches,
+each in its own transaction, by a background task in every API worker or
+by a one-off run:
+
+    python -m app.purge
+"""
+
+import asyncio
+import logging
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import exists, select, text
+from starlette.concurrency import run_in_threadpool
+
+# Add the server directory to the path when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import models
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Invoices or customers removed per transaction, so a purge never holds locks for long
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", 1000))
+
+# Seconds between runs of the background purge, 0 disables it
+PURGE_INTERVAL_SECONDS = float(os.getenv("PURGE_INTERVAL_SECONDS", 60))
+
+# Seconds a soft-deleted row is kept before it is purged
+PURGE_RETENTION_SECONDS = float(os.getenv("PURGE_RETENTION_SECONDS", 0))
+
+# Key of the advisory lock that keeps workers from purging the same batch on PostgreSQL
+PURGE_LOCK_ID = 8_214_031_178
+
+def _lock_batch(db) -> bool:
+    """Take the purge lock for the current transaction, False if another worker holds it"""
+    if db.get_bind().dialect.name != "postgresql":
+        return True
+    return db.execute(text("SELECT pg_try_advisory_xact_lock(:id)"), {"id": PURGE_LOCK_ID}).scalar()
+
+def _purge_invoice_batch(db, cutoff: datetime, batch_size: int) -> int:
+    invoice_ids = db.execute(
+        select(models.Invoice.id).where(models.Invoice.deleted_at < cutoff).limit(batch_size)
+    ).scalars().all()
+    if invoice_ids:
+        db.query(models.InvoiceItem).filter(models.InvoiceItem.invoice_id.in_(invoice_ids)).delete(synchronize_session=False)
+        db.query(models.Invoice).filter(models.Invoice.id.in_(invoice_ids)).delete(synchronize_session=False)
+    return len(invoice_ids)
+
+def _purge_customer_batch(db, cutoff: datetime, batch_size: int) -> int:
+    # A customer is removed once no invoice references it any more
+    customer_ids = db.execute(
+        select(models.Customer.id).where(
+            models.Customer.deleted_at < cutoff,
+            ~exists().where(models.Invoice.customer_id == models.Customer.id)
+        ).limit(batch_size)
+    ).scalars().all()
+    if customer_ids:
+        db.query(models.Customer).filter(models.Customer.id.in_(customer_ids)).delete(synchronize_session=False)
+    return len(customer_ids)
+
+def purge_deleted(batch_size: int = PURGE_BATCH_SIZE, retention_seconds: float = PURGE_RETENTION_SECONDS):
+    """Remove soft-deleted invoices (with their items), then customers, and return the counts"""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=retention_seconds)
+    counts = {"invoices": 0, "customers": 0}
+    db = SessionLocal()
+    try:
+        # Invoices first, so the customers they reference can go in the same run
+        for key, purge_batch in (("invoices", _purge_invoice_batch), ("customers", _purge_customer_batch)):
+            while True:
+                if not _lock_batch(db):
+                    db.rollback()
+                    return counts
+                purged = purge_batch(db, cutoff, batch_size)
+                db.commit()
+                counts[key] += purged
+                if purged < batch_size:
+                    break
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return counts
+
+async def purge_worker():
+    """Purge soft-deleted rows every PURGE_INTERVAL_SECONDS until cancelled"""
+    while True:
+        await asyncio.sleep(PURGE_INTERVAL_SECONDS)
+        try:
+            counts = await run_in_threadpool(purge_deleted)
+        except Exception:
+            logger.exception("Purging soft-deleted rows failed")
+            continue
+        if any(counts.values()):
+            logger.info("Purged %d invoices and %d customers", counts["invoices"], counts["customers"])
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    counts = purge_deleted()
+    logger.info("Purged %d invoices and %d customers", counts["invoices"], counts["customers"])
@@ -0,0 +1,164 @@
+import hashlib
+import hmac
+import itertools
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated URLs of read replicas used by reporting endpoints
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+
+# Seconds a replica that failed to connect is skipped before it is tried again
+DB_REPLICA_RETRY_SECONDS = float(os.getenv("DB_REPLICA_RETRY_SECONDS", 30))
+
+# Seconds after a write during which the same client reads from the primary
+DB_REPLICA_STICKY_SECONDS = float(os.getenv("DB_REPLICA_STICKY_SECONDS", 5))
+
+# Tracked clients with recent writes before old entries are pruned
+RECENT_WRITES_MAX_SIZE = 10000
+
+# Cookie telling every worker that the client wrote recently, signed with the JWT secret
+STICKY_COOKIE = "bizify_primary_until"
+STICKY_COOKIE_SECRET = os.getenv("SECRET_KEY", "your_secret_key_here").encode()
+
+
+class RequestWrites:
+    """Whether the request being served has committed a write"""
+
+    __slots__ = ("client", "committed")
+
+    def __init__(self, client: Optional[str]):
+        self.client = client
+        self.committed = False
+
+
+_request_writes: ContextVar[Optional[RequestWrites]] = ContextVar("request_writes", default=None)
+
+
+def _sign(until: int) -> str:
+    return hmac.new(STICKY_COOKIE_SECRET, str(until).encode(), hashlib.sha256).hexdigest()
+
+
+def sticky_cookie_value(until: int) -> str:
+    return f"{until}.{_sign(until)}"
+
+
+def sticky_cookie_active(value: Optional[str]) -> bool:
+    """True if the cookie is correctly signed and has not expired yet"""
+    if not value:
+        return False
+    until, _, signature = value.partition(".")
+    if not until.isdigit() or not hmac.compare_digest(signature, _sign(int(until))):
+        return False
+    return int(until) > time.time()
+
+
+class ReplicaRouter:
+    """Pick a read replica per request, round-robin with failover.
+
+    A replica whose connection attempt fails is marked down for
+    DB_REPLICA_RETRY_SECONDS and the next one is tried; when none can be
+    reached the caller falls back to the primary. Failover only happens when
+    a request opens its connection; a replica failing mid-request fails that
+    request. Health is tracked per worker process.
+
+    Clients that committed a write in the last DB_REPLICA_STICKY_SECONDS keep
+    reading from the primary so they see their own changes despite
+    replication lag. The write is recorded when the session commits, before
+    the response is sent, both in this worker and in a signed cookie that
+    ReplicaStickinessMiddleware sets, so requests served by other workers
+    honour it too.
+    """
+
+    def __init__(self, engines: List[Engine]):
+        self.engines = engines
+        self._cycle = itertools.cycle(range(len(engines)))
+        self._down_until: Dict[int, float] = {}
+        self._recent_writes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def connect(self) -> Optional[Connection]:
+        """Open a connection to the next healthy replica, or None if none is reachable"""
+        for _ in range(len(self.engines)):
+            with self._lock:
+                index = next(self._cycle)
+                if self._down_until.get(index, 0) > time.monotonic():
+                    continue
+            try:
+                return self.engines[index].connect()
+            except DBAPIError as e:
+                logger.warning("Read replica %r unavailable: %s", self.engines[index].url, e)
+                with self._lock:
+                    self._down_until[index] = time.monotonic() + DB_REPLICA_RETRY_SECONDS
+        return None
+
+    def record_write(self, client: Optional[str]):
+        if not client or not self.engines:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._recent_writes[client] = now + DB_REPLICA_STICKY_SECONDS
+            if len(self._recent_writes) > RECENT_WRITES_MAX_SIZE:
+                self._recent_writes = {key: until for key, until in self._recent_writes.items() if until > now}
+
+    def record_commit(self):
+        """Mark the request being served as having written, called when a session commits"""
+        request_writes = _request_writes.get()
+        if request_writes is None or not self.engines:
+            return
+        request_writes.committed = True
+        self.record_write(request_writes.client)
+
+    def wrote_recently(self, client: Optional[str], cookie: Optional[str] = None) -> bool:
+        if sticky_cookie_active(cookie):
+            return True
+        if not client:
+            return False
+        with self._lock:
+            return self._recent_writes.get(client, 0) > time.monotonic()
+
+    def status(self) -> List[Dict[str, object]]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {"url": engine.url.render_as_string(hide_password=True), "healthy": self._down_until.get(index, 0) <= now}
+                for index, engine in enumerate(self.engines)
+            ]
+
+
+class ReplicaStickinessMiddleware:
+    """Set the sticky cookie on responses to requests that committed a write"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not DATABASE_REPLICA_URLS:
+            await self.app(scope, receive, send)
+            return
+
+        request_writes = RequestWrites(dict(scope["headers"]).get(b"authorization", b"").decode("latin-1") or None)
+        token = _request_writes.set(request_writes)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and request_writes.committed:
+                until = int(time.time() + DB_REPLICA_STICKY_SECONDS) + 1
+                cookie = (
+                    f"{STICKY_COOKIE}={sticky_cookie_value(until)}; Max-Age={int(DB_REPLICA_STICKY_SECONDS) + 1}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_writes.reset(token)
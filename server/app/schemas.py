@@ -3,6 +3,7 @@ from pydantic import BaseModel, EmailStr, Field, validator
 from typing import List, Optional, Union
 from datetime import datetime, date
 from enum import Enum
+import json
 
 # Enum for invoice status
 class InvoiceStatusEnum(str, Enum):
@@ -315,6 +316,7 @@ class ExportFormat(str, Enum):
     CSV = "csv"
     EXCEL = "excel"
     BACKUP = "backup"
+    PARQUET = "parquet"
 
 class ExportRequest(BaseModel):
     format: ExportFormat = ExportFormat.JSON
@@ -341,6 +343,21 @@ class ImportOptions(BaseModel):
     import_invoices: bool = True
     skip_duplicates: bool = True
 
+class UploadCreate(BaseModel):
+    filename: str
+    total_size: int
+
+class UploadStatus(BaseModel):
+    upload_id: str
+    filename: str
+    total_size: int
+    offset: int
+    chunk_size: int
+    complete: bool
+
+class UploadFinalize(ImportOptions):
+    sha256: str
+
 class ImportPreview(BaseModel):
     total_customers: int
     total_invoices: int
@@ -362,6 +379,53 @@ class ImportResult(BaseModel):
     errors: List[str] = []
     warnings: List[str] = []
 
+class ImportJob(BaseModel):
+    id: int
+    filename: str
+    status: str
+    phase: str
+    total_customers: int = 0
+    total_invoices: int = 0
+    customers_done: int = 0
+    invoices_done: int = 0
+    error_count: int = 0
+    errors: List[str] = []
+    warnings: List[str] = []
+    stats: ImportStats = ImportStats()
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    # Progress, errors and stats are stored JSON encoded on the job row
+    @validator('errors', 'warnings', pre=True)
+    def parse_messages(cls, v):
+        if isinstance(v, str):
+            return json.loads(v)
+        return v or []
+
+    @validator('stats', pre=True)
+    def parse_stats(cls, v):
+        if isinstance(v, str):
+            return json.loads(v)
+        return v or {}
+
+    @validator('total_customers', 'total_invoices', 'customers_done', 'invoices_done', 'error_count', pre=True)
+    def default_zero(cls, v):
+        return v or 0
+
+    class Config:
+        orm_mode = True
+
+class ResetJob(BaseModel):
+    id: int
+    status: str
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
 class ExportResponse(BaseModel):
     task_id: Optional[str] = None
     status: str
@@ -0,0 +1,72 @@
+from operator import attrgetter
+from typing import Any, Iterable, List, Tuple
+
+import orjson
+from fastapi.responses import ORJSONResponse
+
+from app import models, schemas
+
+# Options matching pydantic's JSON output (UTC datetimes end in "Z")
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+class JSONResponse(ORJSONResponse):
+    """Default response class, renders content with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class RowSerializer:
+    """Convert ORM rows straight to dicts with the fields of a response schema.
+
+    The field list and attribute getter are built once from the schema, so
+    serializing a row is a single attrgetter call instead of a pydantic
+    validation plus jsonable_encoder pass. Values are left as Python objects
+    (datetimes, enums) for orjson to encode. Fields whose schema validator
+    turns NULL into the field default are listed in none_defaults, so they
+    get the same default here.
+    """
+
+    def __init__(self, schema, exclude: Tuple[str, ...] = (), none_defaults: Tuple[str, ...] = ()):
+        self.fields = tuple(name for name in schema.model_fields if name not in exclude)
+        self.getter = attrgetter(*self.fields)
+        self.defaults = {name: schema.model_fields[name].default for name in none_defaults}
+
+    def __call__(self, row) -> dict:
+        data = dict(zip(self.fields, self.getter(row)))
+        for name, default in self.defaults.items():
+            if data[name] is None:
+                data[name] = default
+        return data
+
+
+serialize_customer = RowSerializer(schemas.Customer)
+serialize_invoice_item = RowSerializer(schemas.InvoiceItem)
+# InvoiceBase validators return 0.0 for a NULL tax rate or discount
+_serialize_invoice_fields = RowSerializer(
+    schemas.Invoice, exclude=("items", "customer"), none_defaults=("tax_rate", "discount")
+)
+
+
+def serialize_invoice(invoice: models.Invoice) -> dict:
+    data = _serialize_invoice_fields(invoice)
+    data["items"] = [serialize_invoice_item(item) for item in invoice.items]
+    data["customer"] = serialize_customer(invoice.customer)
+    return data
+
+
+def customer_response(customer: models.Customer) -> JSONResponse:
+    return JSONResponse(serialize_customer(customer))
+
+
+def customers_response(customers: Iterable[models.Customer]) -> JSONResponse:
+    return JSONResponse([serialize_customer(customer) for customer in customers])
+
+
+def invoice_response(invoice: models.Invoice) -> JSONResponse:
+    return JSONResponse(serialize_invoice(invoice))
+
+
+def invoices_response(invoices: Iterable[models.Invoice]) -> JSONResponse:
+    return JSONResponse([serialize_invoice(invoice) for invoice in invoices])
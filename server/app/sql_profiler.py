@@ -0,0 +1,132 @@
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# When to profile SQL: "off", "header" (requests sending X-Profile-SQL: 1) or "all"
+SQL_PROFILE = os.getenv("SQL_PROFILE", "off").lower()
+
+# Request header that turns profiling on for one request in "header" mode
+SQL_PROFILE_HEADER = b"x-profile-sql"
+
+# Statements slower than this are logged with their query plan
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", 100))
+
+# Run EXPLAIN for slow SELECT statements
+SQL_EXPLAIN_SLOW = os.getenv("SQL_EXPLAIN_SLOW", "true").lower() == "true"
+
+# The same SELECT issued this many times in one request is reported as a likely N+1
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", 5))
+
+
+class QueryProfile:
+    """Statements and timings collected for one request"""
+
+    def __init__(self):
+        self.queries: List[Tuple[str, float]] = []
+
+    @property
+    def total_time(self) -> float:
+        return sum(duration for _, duration in self.queries)
+
+    def repeated_statements(self) -> List[Tuple[str, int]]:
+        counts = Counter(statement for statement, _ in self.queries if statement.lstrip().upper().startswith("SELECT"))
+        return [(statement, count) for statement, count in counts.most_common() if count >= SQL_N_PLUS_ONE_THRESHOLD]
+
+
+_profile: ContextVar[Optional[QueryProfile]] = ContextVar("sql_profile", default=None)
+
+
+def _explain(conn, statement, parameters) -> str:
+    """Return the query plan of a statement, using a separate cursor on the same connection"""
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(column) for column in row) for row in cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _profile.get() is not None:
+        conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _profile.get()
+    if profile is None or not conn.info.get("profile_start"):
+        return
+
+    duration = time.perf_counter() - conn.info["profile_start"].pop()
+    profile.queries.append((statement, duration))
+
+    if duration * 1000 < SQL_SLOW_QUERY_MS:
+        return
+    plan = ""
+    if SQL_EXPLAIN_SLOW and not executemany and statement.lstrip().upper().startswith("SELECT"):
+        try:
+            plan = _explain(conn, statement, parameters)
+        except Exception as e:
+            plan = f"EXPLAIN failed: {e}"
+    logger.warning("Slow query (%.1f ms): %s\nParameters: %r\n%s", duration * 1000, statement, parameters, plan)
+
+
+class SQLProfilerMiddleware:
+    """Profile the SQL of a request and report it in a Server-Timing header.
+
+    Off by default. SQL_PROFILE=all profiles every request, SQL_PROFILE=header
+    only requests that send "X-Profile-SQL: 1". Each profiled request logs its
+    query count and time, and any SELECT repeated often enough to suggest an
+    N+1 pattern.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _should_profile(self, scope) -> bool:
+        if SQL_PROFILE == "all":
+            return True
+        if SQL_PROFILE == "header":
+            return (SQL_PROFILE_HEADER, b"1") in scope.get("headers", [])
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = QueryProfile()
+        token = _profile.set(profile)
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                elapsed = (time.perf_counter() - start) * 1000
+                db_time = profile.total_time * 1000
+                timing = (
+                    f'db;dur={db_time:.1f};desc="{len(profile.queries)} queries", '
+                    f'app;dur={max(elapsed - db_time, 0):.1f}'
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _profile.reset(token)
+            logger.info(
+                "%s %s: %d queries in %.1f ms",
+                scope["method"], scope["path"], len(profile.queries), profile.total_time * 1000
+            )
+            for statement, count in profile.repeated_statements():
+                logger.warning("Possible N+1 in %s %s: %d x %s", scope["method"], scope["path"], count, statement)
@@ -0,0 +1,248 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, BinaryIO, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+# Directory where partial uploads are assembled
+UPLOAD_DIR = Path(os.getenv("IMPORT_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "bizify_uploads")))
+
+# Directory where files of background import jobs are kept until the job completes or expires
+JOB_DIR = UPLOAD_DIR / "jobs"
+
+# Suggested size of each PUT request; clients may send smaller chunks
+UPLOAD_CHUNK_SIZE = int(os.getenv("IMPORT_UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024))
+
+# Largest file accepted for a chunked upload
+UPLOAD_MAX_SIZE = int(os.getenv("IMPORT_UPLOAD_MAX_SIZE", 2 * 1024 * 1024 * 1024))
+
+# Bytes of a request body collected before they are written to the spool file
+UPLOAD_WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Uploads that have not been touched for this long are removed
+UPLOAD_EXPIRY_SECONDS = int(os.getenv("IMPORT_UPLOAD_EXPIRY_SECONDS", 24 * 60 * 60))
+
+
+class UploadOffsetError(ValueError):
+    """A chunk was sent for an offset other than the current end of the upload"""
+
+    def __init__(self, expected_offset: int):
+        super().__init__(f"Chunk offset does not match upload size, expected offset {expected_offset}")
+        self.expected_offset = expected_offset
+
+
+class UploadService:
+    """Assemble large import files from resumable, offset-addressed chunks.
+
+    Each upload is a spool file plus a small JSON metadata file in UPLOAD_DIR.
+    Chunks are appended only when their offset equals the current file size,
+    so a client that lost its connection asks for the status and continues
+    from the reported offset. A writer holds an exclusive flock on the spool
+    file from the offset check to the last byte, so concurrent chunks for
+    the same upload cannot interleave; the loser gets an offset conflict.
+    """
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+        JOB_DIR.mkdir(parents=True, exist_ok=True)
+
+    def _data_path(self, upload_id: str) -> Path:
+        return UPLOAD_DIR / f"{upload_id}.part"
+
+    def _meta_path(self, upload_id: str) -> Path:
+        return UPLOAD_DIR / f"{upload_id}.json"
+
+    def _load_meta(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        """Load upload metadata, or None if it does not exist or belongs to another user"""
+        try:
+            # Only accept canonical UUIDs so the id can never escape UPLOAD_DIR
+            if str(uuid.UUID(upload_id)) != upload_id:
+                return None
+        except ValueError:
+            return None
+
+        try:
+            with open(self._meta_path(upload_id), "r") as f:
+                meta = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        if meta.get("user_id") != self.user_id:
+            return None
+        return meta
+
+    def _status(self, meta: Dict[str, Any]) -> Dict[str, Any]:
+        offset = self._data_path(meta["upload_id"]).stat().st_size
+        return {
+            "upload_id": meta["upload_id"],
+            "filename": meta["filename"],
+            "total_size": meta["total_size"],
+            "offset": offset,
+            "chunk_size": UPLOAD_CHUNK_SIZE,
+            "complete": offset == meta["total_size"]
+        }
+
+    def cleanup_expired(self):
+        """Remove uploads that have not been written to for UPLOAD_EXPIRY_SECONDS"""
+        cutoff = time.time() - UPLOAD_EXPIRY_SECONDS
+        for path in UPLOAD_DIR.glob("*.json"):
+            data_path = path.with_suffix(".part")
+            try:
+                last_write = data_path.stat().st_mtime if data_path.exists() else path.stat().st_mtime
+                if last_write < cutoff:
+                    data_path.unlink(missing_ok=True)
+                    path.unlink(missing_ok=True)
+            except OSError:
+                # Another worker removed it first
+                pass
+
+    @staticmethod
+    def cleanup_job_files(referenced):
+        """Remove files in JOB_DIR older than UPLOAD_EXPIRY_SECONDS that no import job refers to"""
+        cutoff = time.time() - UPLOAD_EXPIRY_SECONDS
+        for path in JOB_DIR.glob("*"):
+            try:
+                if str(path) not in referenced and path.stat().st_mtime < cutoff:
+                    path.unlink(missing_ok=True)
+            except OSError:
+                # Another worker removed it first
+                pass
+
+    def create_upload(self, filename: str, total_size: int) -> Dict[str, Any]:
+        """Start a new upload and return its status"""
+        if total_size <= 0:
+            raise ValueError("Upload size must be greater than 0")
+        if total_size > UPLOAD_MAX_SIZE:
+            raise ValueError(f"Upload size exceeds the maximum of {UPLOAD_MAX_SIZE} bytes")
+
+        self.cleanup_expired()
+
+        upload_id = str(uuid.uuid4())
+        meta = {
+            "upload_id": upload_id,
+            "user_id": self.user_id,
+            "filename": os.path.basename(filename),
+            "total_size": total_size,
+            "created_at": time.time()
+        }
+        self._data_path(upload_id).touch()
+        with open(self._meta_path(upload_id), "w") as f:
+            json.dump(meta, f)
+
+        return self._status(meta)
+
+    def get_upload(self, upload_id: str) -> Optional[Dict[str, Any]]:
+        """Return the status of an upload, or None if it does not exist"""
+        meta = self._load_meta(upload_id)
+        if meta is None:
+            return None
+        return self._status(meta)
+
+    def get_upload_path(self, upload_id: str) -> Optional[Path]:
+        """Return the path of the spool file of an upload"""
+        if self._load_meta(upload_id) is None:
+            return None
+        return self._data_path(upload_id)
+
+    async def write_chunk(self, upload_id: str, offset: int, chunks: AsyncIterator[bytes]) -> Optional[Dict[str, Any]]:
+        """Append a streamed chunk at the given offset and return the new status"""
+        meta = self._load_meta(upload_id)
+        if meta is None:
+            return None
+
+        f = await run_in_threadpool(open, self._data_path(upload_id), "ab")
+        try:
+            current = await run_in_threadpool(self._lock_for_append, f)
+            if current is None or offset != current:
+                # Another request is writing this upload, or the client is behind
+                raise UploadOffsetError(self._data_path(upload_id).stat().st_size if current is None else current)
+
+            written = current
+            buffer = bytearray()
+            try:
+                async for chunk in chunks:
+                    if written + len(buffer) + len(chunk) > meta["total_size"]:
+                        raise ValueError("Chunk exceeds the declared upload size")
+                    buffer += chunk
+                    if len(buffer) >= UPLOAD_WRITE_BUFFER_SIZE:
+                        await run_in_threadpool(f.write, bytes(buffer))
+                        written += len(buffer)
+                        buffer.clear()
+                await run_in_threadpool(f.write, bytes(buffer))
+                await run_in_threadpool(f.flush)
+            except ValueError:
+                # Drop the partial chunk so the client can retry from offset
+                await run_in_threadpool(f.truncate, current)
+                raise
+        finally:
+            # Closing the file releases the lock
+            await run_in_threadpool(f.close)
+
+        return await run_in_threadpool(self._status, meta)
+
+    @staticmethod
+    def _lock_for_append(f) -> Optional[int]:
+        """Lock the spool file and return its size, or None if another writer holds the lock"""
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return None
+        return os.fstat(f.fileno()).st_size
+
+    def finalize_upload(self, upload_id: str, sha256: str) -> Optional[Path]:
+        """Verify a completed upload and return the path of the assembled file"""
+        meta = self._load_meta(upload_id)
+        if meta is None:
+            return None
+
+        status = self._status(meta)
+        if not status["complete"]:
+            raise UploadOffsetError(status["offset"])
+
+        digest = hashlib.sha256()
+        with open(self._data_path(upload_id), "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+
+        if digest.hexdigest() != sha256.lower():
+            # The data cannot be repaired by resuming, the client has to upload it again
+            self.delete_upload(upload_id)
+            raise ValueError("Checksum mismatch, the uploaded file is corrupted and was discarded")
+
+        return self._data_path(upload_id)
+
+    def delete_upload(self, upload_id: str) -> bool:
+        """Remove an upload and its spool file"""
+        meta = self._load_meta(upload_id)
+        if meta is None:
+            return False
+
+        self._data_path(upload_id).unlink(missing_ok=True)
+        self._meta_path(upload_id).unlink(missing_ok=True)
+        return True
+
+    def save_job_file(self, fileobj: BinaryIO, filename: str) -> Path:
+        """Copy an uploaded file to a location that outlives the request"""
+        path = JOB_DIR / f"{uuid.uuid4()}{Path(filename).suffix}"
+        with open(path, "wb") as f:
+            shutil.copyfileobj(fileobj, f, 1024 * 1024)
+        return path
+
+    def move_to_job(self, upload_id: str) -> Optional[Path]:
+        """Hand a finalized upload over to a background job"""
+        meta = self._load_meta(upload_id)
+        if meta is None:
+            return None
+
+        path = JOB_DIR / f"{upload_id}{Path(meta['filename']).suffix}"
+        os.replace(self._data_path(upload_id), path)
+        self._meta_path(upload_id).unlink(missing_ok=True)
+        return path
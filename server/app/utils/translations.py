@@ -1,94 +1,198 @@
 import json
 import os
 import logging
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+TRANSLATIONS_DIR = Path(__file__).parent.parent / 'translations'
+
+# Seconds between checks for changed, added or removed translation files, 0 disables reloading
+TRANSLATIONS_RELOAD_INTERVAL = float(os.getenv("TRANSLATIONS_RELOAD_INTERVAL", 5))
+
+# Flattened catalogs per language: {"invoice.title": "INVOICE", ...}
+# Non-English catalogs already contain the English fallbacks for missing keys.
+# Reloads build a new dict and swap it in, so readers never see a partial catalog.
 _translations = {}
 
+# Modification times of the loaded files, compared to detect changes
+_file_mtimes = {}
+_last_check = 0.0
+_reload_lock = threading.Lock()
+
+# Missing languages and keys already reported, so each is logged once per load.
+# Callers can pass any key or language, so only the most recent ones are kept.
+MAX_MISSING_REPORTED = 1000
+_missing = OrderedDict()
+_missing_lock = threading.Lock()
+
+# Month names per language, used instead of the process-global locale
+MONTH_NAMES = {
+    'en': ('January', 'February', 'March', 'April', 'May', 'June',
+           'July', 'August', 'September', 'October', 'November', 'December'),
+    'de': ('Januar', 'Februar', 'März', 'April', 'Mai', 'Juni',
+           'Juli', 'August', 'September', 'Oktober', 'November', 'Dezember'),
+}
+
+# Date layout per language
+DATE_PATTERNS = {
+    'en': '{month} {day:02d}, {year}',
+    'de': '{day:02d}. {month} {year}',
+}
+
+# Maps the "1,234.56" output of Python's format() to each language's separators
+NUMBER_SEPARATORS = {
+    'en': str.maketrans({}),
+    'de': str.maketrans({',': '.', '.': ','}),
+}
+
+# Position of the currency symbol per language
+CURRENCY_PATTERNS = {
+    'en': '{sign}{symbol}{amount}',
+    'de': '{sign}{amount} {symbol}',
+}
+
+CURRENCY_SYMBOLS = {
+    'USD': '$',
+    'EUR': '€',
+    'GBP': '£',
+    'CAD': 'CA$',
+    'AUD': 'A$'
+}
+
+def _flatten(tree, prefix=''):
+    """Flatten nested translations into dotted keys, keeping the nested groups too"""
+    flat = {}
+    for key, value in tree.items():
+        dotted = f"{prefix}{key}"
+        flat[dotted] = value
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{dotted}."))
+    return flat
+
+def _scan_mtimes():
+    """Return {filename: mtime} of the translation files"""
+    try:
+        return {
+            entry.name: entry.stat().st_mtime_ns
+            for entry in os.scandir(TRANSLATIONS_DIR)
+            if entry.name.endswith('.json')
+        }
+    except FileNotFoundError:
+        return {}
+
 def load_translations():
     """Load all translation files"""
-    translations_dir = Path(__file__).parent.parent / 'translations'
-    
+    global _translations, _file_mtimes
+
     # Create translations directory if it doesn't exist
-    if not os.path.exists(translations_dir):
-        logger.warning(f"Translations directory not found: {translations_dir}")
+    if not os.path.exists(TRANSLATIONS_DIR):
+        logger.warning("Translations directory not found: %s", TRANSLATIONS_DIR)
         return
-    
-    for filename in os.listdir(translations_dir):
-        if filename.endswith('.json'):
-            language = filename.split('.')[0]
-            try:
-                with open(os.path.join(translations_dir, filename), 'r', encoding='utf-8') as f:
-                    _translations[language] = json.load(f)
-                logger.info(f"Loaded translations for language: {language}")
-            except Exception as e:
-                logger.error(f"Error loading translation file {filename}: {e}")
+
+    mtimes = _scan_mtimes()
+    catalogs = {}
+    for filename in mtimes:
+        language = filename.split('.')[0]
+        try:
+            with open(os.path.join(TRANSLATIONS_DIR, filename), 'r', encoding='utf-8') as f:
+                catalogs[language] = _flatten(json.load(f))
+            logger.info("Loaded translations for language: %s", language)
+        except Exception as e:
+            logger.error("Error loading translation file %s: %s", filename, e)
+            # Keep serving the previous version of a file that is broken or half written
+            if language in _translations:
+                catalogs[language] = _translations[language]
+
+    # Merge the English fallbacks in once, so a lookup is a single dict access
+    english = catalogs.get('en', {})
+    _translations = {
+        language: catalog if language == 'en' else {**english, **catalog}
+        for language, catalog in catalogs.items()
+    }
+    _file_mtimes = mtimes
+    with _missing_lock:
+        _missing.clear()
+
+def preload_translations():
+    """Load the catalogs up front, called at worker start"""
+    global _last_check
+    with _reload_lock:
+        load_translations()
+        _last_check = time.monotonic()
+
+def _reload_if_changed():
+    """Reload the catalogs when a translation file changed, at most once per interval"""
+    global _last_check
+    if not _translations:
+        preload_translations()
+        return
+    if TRANSLATIONS_RELOAD_INTERVAL <= 0 or time.monotonic() - _last_check < TRANSLATIONS_RELOAD_INTERVAL:
+        return
+    # Only one thread checks; the others keep using the current catalogs
+    if not _reload_lock.acquire(blocking=False):
+        return
+    try:
+        _last_check = time.monotonic()
+        if _scan_mtimes() != _file_mtimes:
+            logger.info("Translation files changed, reloading")
+            load_translations()
+    finally:
+        _reload_lock.release()
+
+def _warn_once(marker, message, *args):
+    with _missing_lock:
+        if marker in _missing:
+            _missing.move_to_end(marker)
+            return
+        _missing[marker] = None
+        if len(_missing) > MAX_MISSING_REPORTED:
+            _missing.popitem(last=False)
+    logger.warning(message, *args)
 
 def get_translation(key, language='en'):
     """Get a translation by key and language"""
-    if not _translations:
-        load_translations()
-    
-    # Fallback to English if translation not found
-    if language not in _translations:
-        logger.warning(f"Language not found: {language}, falling back to English")
-        language = 'en'
-    
-    # Navigate nested keys (e.g., "invoice.title")
-    value = _translations.get(language, {})
-    for part in key.split('.'):
-        if isinstance(value, dict) and part in value:
-            value = value[part]
-        else:
-            # Key not found, fallback to English
-            if language != 'en':
-                logger.warning(f"Translation key not found: {key} in language {language}, falling back to English")
-                return get_translation(key, 'en')
-            logger.warning(f"Translation key not found: {key} in English, returning key")
-            return key
-    
+    _reload_if_changed()
+    translations = _translations
+
+    catalog = translations.get(language)
+    if catalog is None:
+        # Fallback to English if the language is not available
+        _warn_once((language, None), "Language not found: %s, falling back to English", language)
+        catalog = translations.get('en', {})
+
+    value = catalog.get(key)
+    if value is None:
+        _warn_once((language, key), "Translation key not found: %s in language %s, returning key", key, language)
+        return key
     return value
 
 def format_date(date_obj, language='en'):
     """Format date based on language"""
-    locale_map = {
-        'en': 'en_US',
-        'de': 'de_DE'
-    }
-    locale = locale_map.get(language, 'en_US')
-    
-    import locale as loc
-    try:
-        loc.setlocale(loc.LC_TIME, locale)
-        return date_obj.strftime('%d. %B %Y' if language == 'de' else '%B %d, %Y')
-    except Exception as e:
-        logger.error(f"Error formatting date with locale {locale}: {e}")
-        # Fallback if locale not available
-        return date_obj.strftime('%Y-%m-%d')
+    if date_obj is None:
+        return ''
+    if language not in DATE_PATTERNS:
+        language = 'en'
+    return DATE_PATTERNS[language].format(
+        day=date_obj.day,
+        month=MONTH_NAMES[language][date_obj.month - 1],
+        year=date_obj.year
+    )
 
 def format_currency(amount, currency='USD', language='en'):
-    """Format currency based on language"""
-    locale_map = {
-        'en': 'en_US',
-        'de': 'de_DE'
-    }
-    locale = locale_map.get(language, 'en_US')
+    """Format currency based on language.
     
-    try:
-        import locale as loc
-        loc.setlocale(loc.LC_MONETARY, locale)
-        return loc.currency(amount, currency, grouping=True)
-    except Exception as e:
-        logger.error(f"Error formatting currency with locale {locale}: {e}")
-        # Fallback if locale not available
-        currency_symbols = {
-            'USD': '$',
-            'EUR': '€',
-            'GBP': '£',
-            'CAD': 'CA$',
-            'AUD': 'A$'
-        }
-        symbol = currency_symbols.get(currency, currency)
-        return f"{symbol}{amount:.2f}"
+    The symbol is that of the given currency. The former locale.currency
+    call always used the locale's own symbol, so EUR amounts printed as
+    "$" in English and USD amounts as "€" in German.
+    """
+    if language not in CURRENCY_PATTERNS:
+        language = 'en'
+    return CURRENCY_PATTERNS[language].format(
+        sign='-' if amount < 0 else '',
+        symbol=CURRENCY_SYMBOLS.get(currency, currency),
+        amount=format(abs(amount), ',.2f').translate(NUMBER_SEPARATORS[language])
+    )
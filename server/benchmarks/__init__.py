@@ -0,0 +1 @@
+"""Synthetic tenants and end-to-end benchmarks for the Bizify API."""
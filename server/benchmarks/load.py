@@ -0,0 +1,264 @@
+"""
+Load generator for a running Bizify server.
+Simulates concurrent users that log in and then repeatedly run weighted
+scenarios (browse invoices, open the dashboard, download a PDF, export),
+and reports throughput and p50/p95/p99 latency per route.
+
+    python run.py  # in another terminal
+    python -m benchmarks.load --users 50 --ramp-up 10 --duration 60
+    python -m benchmarks.load --scenarios browse_invoices=5 dashboard=2 download_pdf=1 --output load.json
+
+The account given by --email/--password must exist and should hold data,
+e.g. created with scripts/mockup_data.py or benchmarks.tenant.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+logger = logging.getLogger("benchmarks.load")
+
+
+class LoadStats:
+    """Latencies and status codes per route, shared by all virtual users"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.started = None
+        self.finished = None
+
+    def record(self, route, elapsed, ok):
+        self.latencies[route].append(elapsed)
+        if not ok:
+            self.errors[route] += 1
+
+    def summary(self):
+        duration = (self.finished or time.perf_counter()) - self.started
+        routes = {route: route_summary(latencies, self.errors[route], duration)
+                  for route, latencies in sorted(self.latencies.items())}
+        all_latencies = [elapsed for latencies in self.latencies.values() for elapsed in latencies]
+        total = route_summary(all_latencies, sum(self.errors.values()), duration) if all_latencies else None
+        return {"duration_seconds": round(duration, 2), "total": total, "routes": routes}
+
+
+def percentile(ordered, q):
+    """Nearest-rank percentile of an ascending list"""
+    index = max(0, min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def route_summary(latencies, errors, duration):
+    ordered = sorted(elapsed * 1000 for elapsed in latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / duration, 2) if duration else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered), 2),
+        "p50_ms": round(percentile(ordered, 50), 2),
+        "p95_ms": round(percentile(ordered, 95), 2),
+        "p99_ms": round(percentile(ordered, 99), 2),
+        "max_ms": round(ordered[-1], 2),
+    }
+
+
+class VirtualUser:
+    """One simulated browser session with its own token"""
+
+    def __init__(self, client, stats, email, password, rng):
+        self.client = client
+        self.stats = stats
+        self.email = email
+        self.password = password
+        self.rng = rng
+        self.headers = {}
+        self.invoice_ids = []
+
+    async def request(self, method, url, route=None, **kwargs):
+        """Send a request and record its latency under the route template"""
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except Exception as e:
+            self.stats.record(f"{method} {route or url}", time.perf_counter() - start, False)
+            logger.debug("%s %s failed: %s", method, url, e)
+            return None
+        self.stats.record(f"{method} {route or url}", time.perf_counter() - start, response.status_code < 400)
+        return response
+
+    async def login(self):
+        self.headers = {}
+        response = await self.request(
+            "POST", "/api/auth/token", data={"username": self.email, "password": self.password}
+        )
+        if response is None or response.status_code != 200:
+            return False
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        return True
+
+
+async def scenario_login(user):
+    await user.login()
+    await user.request("GET", "/api/auth/me")
+    await user.request("GET", "/api/settings")
+
+
+async def scenario_browse_invoices(user):
+    response = await user.request("GET", "/api/invoices", params={"limit": 100})
+    if response is not None and response.status_code == 200:
+        user.invoice_ids = [invoice["id"] for invoice in response.json()]
+    await user.request("GET", "/api/invoices", params={"skip": 100, "limit": 100})
+    if user.invoice_ids:
+        invoice_id = user.rng.choice(user.invoice_ids)
+        await user.request("GET", f"/api/invoices/{invoice_id}", route="/api/invoices/{invoice_id}")
+
+
+async def scenario_dashboard(user):
+    await user.request("GET", "/api/dashboard")
+    await user.request("GET", "/api/invoices/stats")
+    await user.request("GET", "/api/customers/stats")
+
+
+async def scenario_download_pdf(user):
+    if not user.invoice_ids:
+        await scenario_browse_invoices(user)
+    if user.invoice_ids:
+        invoice_id = user.rng.choice(user.invoice_ids)
+        await user.request("GET", f"/api/invoices/{invoice_id}/pdf", route="/api/invoices/{invoice_id}/pdf")
+
+
+async def scenario_export(user):
+    await user.request("POST", "/api/export", json={"format": user.rng.choice(["json", "csv"])})
+
+
+SCENARIOS = {
+    "login": scenario_login,
+    "browse_invoices": scenario_browse_invoices,
+    "dashboard": scenario_dashboard,
+    "download_pdf": scenario_download_pdf,
+    "export": scenario_export,
+}
+
+# Scenario mix used when --scenarios is not given
+DEFAULT_WEIGHTS = {"login": 1, "browse_invoices": 6, "dashboard": 4, "download_pdf": 2, "export": 1}
+
+
+async def run_user(client, stats, args, weights, start_delay, deadline, seed):
+    await asyncio.sleep(start_delay)
+    user = VirtualUser(client, stats, args.email, args.password, random.Random(seed))
+    if not await user.login():
+        logger.warning("Virtual user %d could not log in", seed)
+        return
+
+    names, cum_weights = list(weights), []
+    for weight in weights.values():
+        cum_weights.append((cum_weights[-1] if cum_weights else 0) + weight)
+    while time.perf_counter() < deadline:
+        scenario = SCENARIOS[user.rng.choices(names, cum_weights=cum_weights)[0]]
+        await scenario(user)
+        if args.think_time:
+            await asyncio.sleep(user.rng.uniform(0, 2 * args.think_time))
+
+
+async def run_load(args, weights):
+    import httpx
+
+    stats = LoadStats()
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        stats.started = time.perf_counter()
+        deadline = stats.started + args.ramp_up + args.duration
+        tasks = [
+            run_user(client, stats, args, weights, args.ramp_up * i / args.users, deadline, i)
+            for i in range(args.users)
+        ]
+        await asyncio.gather(*tasks)
+        stats.finished = time.perf_counter()
+    return stats
+
+
+def parse_weights(values):
+    """Parse name=weight pairs, a bare name has weight 1"""
+    weights = {}
+    for value in values:
+        name, _, weight = value.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario {name!r}, choose from {', '.join(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def print_report(summary):
+    header = f"{'route':<42} {'reqs':>7} {'errors':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    print("-" * len(header))
+    rows = list(summary["routes"].items())
+    if summary["total"]:
+        rows.append(("TOTAL", summary["total"]))
+    for route, row in rows:
+        print(f"{route:<42} {row['requests']:>7} {row['errors']:>6} {row['throughput_rps']:>8.1f} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate concurrent load against a running Bizify server")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="URL of the server under test")
+    parser.add_argument("--email", default="demo@example.com", help="Account the virtual users log in with")
+    parser.add_argument("--password", default="password123", help="Password of the account")
+    parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("--ramp-up", type=float, default=5, help="Seconds over which the users are started")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run at full concurrency")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Mean pause in seconds between scenarios")
+    parser.add_argument("--timeout", type=float, default=60, help="Request timeout in seconds")
+    parser.add_argument("--scenarios", nargs="+", metavar="NAME[=WEIGHT]",
+                        help=f"Scenario mix (default: {' '.join(f'{k}={v}' for k, v in DEFAULT_WEIGHTS.items())})")
+    parser.add_argument("--output", help="Also write the results as JSON to this file")
+    parser.add_argument("--verbose", action="store_true", help="Log failed requests")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format="%(asctime)s %(levelname)s %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logging.getLogger("httpcore").setLevel(logging.WARNING)
+
+    try:
+        weights = parse_weights(args.scenarios) if args.scenarios else DEFAULT_WEIGHTS
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+
+    logger.info("Starting %d users over %.0f s, running %.0f s against %s",
+                args.users, args.ramp_up, args.duration, args.base_url)
+    stats = asyncio.run(run_load(args, weights))
+    summary = stats.summary()
+    if not summary["total"]:
+        logger.error("No requests were made, is the server running?")
+        sys.exit(1)
+
+    print_report(summary)
+    if args.output:
+        report = {
+            "meta": {
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "base_url": args.base_url,
+                "users": args.users,
+                "ramp_up_seconds": args.ramp_up,
+                "duration_seconds": args.duration,
+                "think_time_seconds": args.think_time,
+                "scenarios": weights,
+            },
+            **summary,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info("Results written to %s", args.output)
+
+
+if __name__ == "__main__":
+    main()
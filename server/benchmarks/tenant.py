@@ -0,0 +1,243 @@
+"""
+Synthetic tenant generator for benchmarks.
+Builds one user with settings, customers, invoices and items without the
+ORM: random values are drawn a whole batch at a time, primary keys are
+reserved up front, and rows are written with PostgreSQL COPY FROM STDIN
+(a plain executemany on other databases). The password is hashed once.
+Invoices are spread over customers with a Zipf distribution, so a few
+customers own most of the invoices, as in real books.
+"""
+
+import enum
+import io
+import itertools
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, insert, select, text
+
+from app import models
+from app.auth import get_password_hash
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT batch
+BATCH_SIZE = 5000
+
+# Zipf exponent of the invoices-per-customer distribution
+ZIPF_EXPONENT = 1.1
+
+# Share of each invoice status
+STATUS_WEIGHTS = {
+    models.InvoiceStatus.PAID: 55,
+    models.InvoiceStatus.PENDING: 20,
+    models.InvoiceStatus.OVERDUE: 10,
+    models.InvoiceStatus.DRAFT: 10,
+    models.InvoiceStatus.CANCELLED: 5,
+}
+
+# Probability of 1..10 items per invoice, weighted towards short invoices
+ITEM_COUNT_WEIGHTS = [30, 25, 15, 10, 7, 5, 3, 2, 2, 1]
+
+FIRST_NAMES = ["John", "Emma", "Michael", "Sarah", "David", "Jennifer", "Robert", "Sophia", "Lukas", "Anna", "Wei", "Priya"]
+LAST_NAMES = ["Smith", "Johnson", "Brown", "Lee", "Wang", "Garcia", "Schmidt", "Martinez", "Müller", "Rossi", "Kumar", "Novak"]
+CITIES = [("Boston", "MA", "United States"), ("Austin", "TX", "United States"), ("Berlin", "Berlin", "Germany"),
+          ("Seattle", "WA", "United States"), ("Munich", "Bavaria", "Germany"), ("Chicago", "IL", "United States")]
+SERVICES = [("Web Development", 95.0), ("UI/UX Design", 85.0), ("Consulting", 150.0), ("Hosting (monthly)", 29.99),
+            ("SEO Optimization", 75.0), ("Content Writing", 60.0), ("Support Hours", 65.0), ("Software License", 499.0)]
+
+
+def _batches(count, size=BATCH_SIZE):
+    for start in range(0, count, size):
+        yield start, min(size, count - start)
+
+
+def reserve_ids(connection, table, count):
+    """Allocate primary keys for count new rows of table.
+
+    On PostgreSQL the ids come from the table's sequence, so concurrent
+    writers are safe. Elsewhere they follow the current maximum, which
+    assumes nothing else inserts into the table meanwhile.
+    """
+    if connection.dialect.name == "postgresql":
+        return connection.execute(
+            text("SELECT nextval(pg_get_serial_sequence(:table, 'id')) FROM generate_series(1, :count)"),
+            {"table": table.name, "count": count}
+        ).scalars().all()
+    start = connection.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar_one() + 1
+    return range(start, start + count)
+
+
+def _copy_value(value):
+    """Format a value for COPY's text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, enum.Enum):
+        # SQLAlchemy stores Python enums by member name
+        return value.name
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def write_rows(connection, table, rows):
+    """Bulk insert rows (dicts with the same keys), bypassing the ORM"""
+    if not rows:
+        return
+    if connection.dialect.driver != "psycopg2":
+        connection.execute(insert(table), rows)
+        return
+
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join([_copy_value(row[column]) for column in columns]))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor = connection.connection.driver_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN", buffer)
+    finally:
+        cursor.close()
+
+
+def get_or_create_user(connection, email, password="password123", name="Benchmark Tenant"):
+    """Return the id of the user with this email, creating it with default settings if needed"""
+    user_id = connection.execute(select(models.User.id).where(models.User.email == email)).scalar()
+    if user_id is not None:
+        return user_id
+    return create_user(connection, email, password, name)
+
+
+def create_user(connection, email, password="password123", name="Benchmark Tenant"):
+    """Insert a user with default settings and return its id"""
+    user_id = connection.execute(
+        insert(models.User).returning(models.User.id),
+        {"email": email, "name": name, "hashed_password": get_password_hash(password), "is_active": True}
+    ).scalar_one()
+    connection.execute(insert(models.Settings), {
+        "user_id": user_id, "company_name": f"{name} Ltd", "currency": "USD",
+        "invoice_prefix": "INV-", "tax_rate": 10.0, "language": "en"
+    })
+    return user_id
+
+
+def customer_rows(user_id, ids, offset, rng):
+    count = len(ids)
+    first_names = rng.choices(FIRST_NAMES, k=count)
+    last_names = rng.choices(LAST_NAMES, k=count)
+    cities = rng.choices(CITIES, k=count)
+    suffixes = rng.choices(["GmbH", "Inc", "LLC", "Group"], k=count)
+    return [
+        {
+            "id": customer_id,
+            "user_id": user_id,
+            "name": f"{first} {last}",
+            "email": f"{first}.{last}.{offset + i}@customer.example".lower(),
+            "phone": f"(555) {rng.randrange(100, 999)}-{rng.randrange(1000, 9999)}",
+            "address": f"{rng.randrange(1, 999)} Main Street",
+            "city": city,
+            "state": state,
+            "zip_code": f"{rng.randrange(10000, 99999)}",
+            "country": country,
+            "company": f"{last} {suffix}",
+        }
+        for i, (customer_id, first, last, (city, state, country), suffix)
+        in enumerate(zip(ids, first_names, last_names, cities, suffixes))
+    ]
+
+
+class InvoiceGenerator:
+    """Draw invoices and items with consistent totals, one batch at a time"""
+
+    def __init__(self, user_id, customer_ids, rng, now):
+        self.user_id = user_id
+        self.customer_ids = customer_ids
+        self.rng = rng
+        self.now = now
+        ranks = range(1, len(customer_ids) + 1)
+        self.customer_weights = list(itertools.accumulate(1 / rank ** ZIPF_EXPONENT for rank in ranks))
+        self.statuses = list(STATUS_WEIGHTS)
+        self.status_weights = list(itertools.accumulate(STATUS_WEIGHTS.values()))
+        self.item_count_weights = list(itertools.accumulate(ITEM_COUNT_WEIGHTS))
+
+    def batch(self, invoice_ids, offset, reserve_item_ids):
+        """Return invoice and item rows for the given invoice ids.
+
+        reserve_item_ids(count) is called once the number of items is known.
+        """
+        rng, count = self.rng, len(invoice_ids)
+        customers = rng.choices(self.customer_ids, cum_weights=self.customer_weights, k=count)
+        statuses = rng.choices(self.statuses, cum_weights=self.status_weights, k=count)
+        item_counts = rng.choices(range(1, 11), cum_weights=self.item_count_weights, k=count)
+        ages = [timedelta(days=rng.randrange(0, 730), seconds=rng.randrange(0, 86400)) for _ in range(count)]
+
+        total_items = sum(item_counts)
+        services = rng.choices(SERVICES, k=total_items)
+        quantities = rng.choices(range(1, 20), k=total_items)
+        item_ids = iter(reserve_item_ids(total_items))
+
+        invoices, items, position = [], [], 0
+        for i in range(count):
+            invoice_id = invoice_ids[i]
+            subtotal = 0.0
+            for (description, unit_price), quantity in zip(
+                services[position:position + item_counts[i]], quantities[position:position + item_counts[i]]
+            ):
+                amount = round(quantity * unit_price, 2)
+                subtotal += amount
+                items.append({"id": next(item_ids), "invoice_id": invoice_id, "description": description,
+                              "quantity": float(quantity), "unit_price": unit_price, "amount": amount})
+            position += item_counts[i]
+
+            issue_date = self.now - ages[i]
+            subtotal = round(subtotal, 2)
+            tax_amount = round(subtotal * 0.1, 2)
+            invoices.append({
+                "id": invoice_id,
+                "user_id": self.user_id,
+                "customer_id": customers[i],
+                "invoice_number": f"INV-{issue_date.year}-{offset + i + 1:07d}",
+                "issue_date": issue_date,
+                "due_date": issue_date + timedelta(days=30),
+                "status": statuses[i],
+                "subtotal": subtotal,
+                "tax_rate": 10.0,
+                "tax_amount": tax_amount,
+                "discount": 0.0,
+                "total": round(subtotal + tax_amount, 2),
+                "created_at": issue_date,
+            })
+        return invoices, items
+
+
+def generate_tenant(engine, email, invoices, customers=None, seed=0, password="password123", name="Benchmark Tenant"):
+    """Add customers and invoices to the user with this email, creating it if needed, and return its id"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    customers = customers or max(10, invoices // 20)
+    customer_table = models.Customer.__table__
+    invoice_table = models.Invoice.__table__
+    item_table = models.InvoiceItem.__table__
+
+    with engine.begin() as connection:
+        user_id = get_or_create_user(connection, email, password, name)
+
+        customer_ids = []
+        for offset, count in _batches(customers):
+            ids = reserve_ids(connection, customer_table, count)
+            write_rows(connection, customer_table, customer_rows(user_id, ids, offset, rng))
+            customer_ids.extend(ids)
+
+        generator = InvoiceGenerator(user_id, customer_ids, rng, now)
+        for offset, count in _batches(invoices):
+            invoice_rows, item_rows = generator.batch(
+                reserve_ids(connection, invoice_table, count), offset,
+                lambda total: reserve_ids(connection, item_table, total)
+            )
+            write_rows(connection, invoice_table, invoice_rows)
+            write_rows(connection, item_table, item_rows)
+            logger.info("Generated %d/%d invoices", offset + count, invoices)
+
+    return user_id
@@ -1,7 +1,7 @@
 """
 Migration to add language column to settings table
 """
-from sqlalchemy import create_engine, MetaData, Table, Column, String
+from sqlalchemy import create_engine, MetaData, Table, Column, String, text
 from app.database import DATABASE_URL
 
 def run_migration():
@@ -27,7 +27,8 @@ def run_migration():
     # Add language column if it doesn't exist
     if 'language' not in existing_columns:
         print("Adding language column to settings table")
-        conn.execute('ALTER TABLE settings ADD COLUMN language VARCHAR DEFAULT "en"')
+        conn.execute(text("ALTER TABLE settings ADD COLUMN language VARCHAR DEFAULT 'en'"))
+        conn.commit()
     
     # Close the connection
     conn.close()
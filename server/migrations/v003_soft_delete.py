@@ -0,0 +1,42 @@
+"""
+Migration to add soft delete columns to customers and invoices
+"""
+from sqlalchemy import create_engine, MetaData, text
+from app.database import DATABASE_URL
+from app import models
+
+def run_migration():
+    """
+    Add deleted_at columns, the partial indexes that skip deleted rows and
+    the plain invoices.customer_id index the customer purge needs
+    """
+    print("Running migration: v003_soft_delete.py")
+
+    # Create engine and connect to the database
+    engine = create_engine(DATABASE_URL)
+    conn = engine.connect()
+
+    # Create metadata object
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+
+    column_type = "TIMESTAMP WITH TIME ZONE" if engine.dialect.name == "postgresql" else "DATETIME"
+    for table_name in ("customers", "invoices"):
+        # Check if the column already exists
+        existing_columns = [c.name for c in metadata.tables[table_name].columns]
+
+        if 'deleted_at' not in existing_columns:
+            print(f"Adding deleted_at column to {table_name} table")
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN deleted_at {column_type}"))
+            conn.commit()
+
+    # Create the indexes declared on the models that do not exist yet
+    for model in (models.Customer, models.Invoice, models.InvoiceItem):
+        for index in model.__table__.indexes:
+            index.create(conn, checkfirst=True)
+    conn.commit()
+
+    # Close the connection
+    conn.close()
+
+    print("Migration completed successfully")
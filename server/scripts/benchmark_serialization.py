@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Benchmark invoice list serialization.
+Compares FastAPI's default response_model path (pydantic validation,
+serialization and the stdlib JSON encoder) with the precompiled row
+serializers and orjson used by the API, on 100 and 1000 invoice pages.
+"""
+
+import sys
+import os
+import asyncio
+import json
+import argparse
+import timeit
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+# Add the parent directory to sys.path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app import models, schemas, serializers
+
+def build_invoices(count, items_per_invoice=5):
+    """Build detached invoices with items and a customer, as a page query would return them."""
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    customer = models.Customer(
+        id=1, user_id=1, name="Acme Corp", email="billing@acme.example",
+        phone="+1 555 0100", address="1 Main St", city="Springfield", state="IL",
+        zip_code="62701", country="USA", company="Acme", notes=None,
+        created_at=now, updated_at=None
+    )
+    invoices = []
+    for i in range(count):
+        items = [
+            models.InvoiceItem(
+                id=i * items_per_invoice + j, invoice_id=i, description=f"Service {j}",
+                quantity=2.0, unit_price=49.5, amount=99.0, created_at=now, updated_at=None
+            )
+            for j in range(items_per_invoice)
+        ]
+        invoice = models.Invoice(
+            id=i, invoice_number=f"INV-2024-{i:05d}", customer_id=1, user_id=1,
+            issue_date=now + timedelta(days=i), due_date=now + timedelta(days=i + 30),
+            status=models.InvoiceStatus.PENDING, notes="Thank you for your business",
+            subtotal=495.0, tax_rate=10.0, tax_amount=49.5, discount=0.0, total=544.5,
+            created_at=now, updated_at=now
+        )
+        invoice.items = items
+        invoice.customer = customer
+        invoices.append(invoice)
+    return invoices
+
+def render_default(field, invoices):
+    """Render the page the way FastAPI does for response_model=List[schemas.Invoice]."""
+    content = asyncio.run(serialize_response(field=field, response_content=invoices, is_coroutine=True))
+    return JSONResponse(content).body
+
+def render_fast(invoices):
+    return serializers.invoices_response(invoices).body
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark invoice list serialization")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000], help="Invoice page sizes")
+    parser.add_argument("--items", type=int, default=5, help="Items per invoice")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions, the best is reported")
+    args = parser.parse_args()
+
+    field = create_response_field(name="Response_read_invoices", type_=List[schemas.Invoice])
+
+    print(f"{'invoices':>8} {'default ms':>12} {'fast ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        invoices = build_invoices(size, args.items)
+
+        # Both paths must produce the same document
+        if json.loads(render_default(field, invoices)) != json.loads(render_fast(invoices)):
+            sys.exit(f"Serialized output differs for {size} invoices")
+
+        number = max(1, 2000 // size)
+        default = min(timeit.repeat(lambda: render_default(field, invoices), number=number, repeat=args.repeat)) / number
+        fast = min(timeit.repeat(lambda: render_fast(invoices), number=number, repeat=args.repeat)) / number
+        print(f"{size:>8} {default * 1000:>12.2f} {fast * 1000:>10.2f} {default / fast:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
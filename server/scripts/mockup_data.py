@@ -9,6 +9,7 @@ import sys
 import os
 import logging
 import random
+import time
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
 import argparse
@@ -16,9 +17,10 @@ import argparse
 # Add the parent directory to sys.path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.database import SessionLocal
+from app.database import SessionLocal, engine
 from app import models
 from app.auth import get_password_hash
+from benchmarks.tenant import generate_tenant
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -353,15 +355,38 @@ def create_mockup_data(user_email="demo@example.com", user_name="Demo User", num
     finally:
         db.close()
 
+def create_bulk_mockup_data(user_email="demo@example.com", user_name="Demo User", num_customers=None, num_invoices=1000000):
+    """Create a large data set for performance testing.
+
+    Rows are generated in batches and written with COPY on PostgreSQL
+    (executemany elsewhere), bypassing the ORM.
+    """
+    start = time.perf_counter()
+    user_id = generate_tenant(engine, user_email, num_invoices, customers=num_customers, name=user_name)
+
+    db = SessionLocal()
+    try:
+        update_company_settings(db, user_id)
+        db.commit()
+    finally:
+        db.close()
+
+    logger.info("Created %d invoices for %s in %.1fs", num_invoices, user_email, time.perf_counter() - start)
+    return user_id
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate mockup data for Bizify")
     parser.add_argument("--email", default="demo@example.com", help="Email for the demo user")
     parser.add_argument("--name", default="Demo User", help="Name for the demo user")
-    parser.add_argument("--customers", type=int, default=6, help="Number of customers to create")
+    parser.add_argument("--customers", type=int, help="Number of customers to create (default: 6, or invoices / 20 with --bulk)")
     parser.add_argument("--invoices", type=int, default=10, help="Number of invoices to create")
+    parser.add_argument("--bulk", action="store_true", help="High-volume mode for performance testing, e.g. --bulk --invoices 1000000")
     
     args = parser.parse_args()
     
     logger.info("Starting mockup data generation...")
-    create_mockup_data(args.email, args.name, args.customers, args.invoices)
+    if args.bulk:
+        create_bulk_mockup_data(args.email, args.name, args.customers, args.invoices)
+    else:
+        create_mockup_data(args.email, args.name, args.customers or 6, args.invoices)
     logger.info("Mockup data generation completed.")
\ No newline at end of file